@@ -47,6 +47,8 @@ class ContextManager:
         self._total_tokens = 0
         self._summary: str = ""
         self._full_history: list[dict] = []  # All messages ever, for retrieval
+        self._cursor = 0          # Total messages ever appended (monotonic)
+        self._compacted_at = 0    # Cursor value at the last summarize/clear
         self.logger = get_logger("agents.context_manager")
 
     @property
@@ -75,20 +77,48 @@ class ContextManager:
             include_tools: If False, strips 'tool' messages and 'tool_calls' 
                           from assistant messages.
         """
-        result = []
+        # Pinned system prompt always leads, then the summary, then the
+        # conversation — so the serialized prefix stays stable across turns.
+        pinned = self._pinned_count()
+        result = self._messages[:pinned]
         if self._summary:
             result.append({
                 "role": "system",
                 "content": f"[Previous conversation summary]\n{self._summary}",
             })
             
-        raw_messages = self._messages
+        raw_messages = self._messages[pinned:]
         
         if include_tools:
             result.extend(raw_messages)
-            return result
-            
-        # Filter tools if not supported
+        else:
+            result.extend(self._filter_tool_messages(raw_messages))
+        return result
+
+    @property
+    def cursor(self) -> int:
+        """Monotonic count of appended messages, for use with get_messages_delta()."""
+        return self._cursor
+
+    def get_messages_delta(self, since: int, include_tools: bool = True) -> list[dict] | None:
+        """
+        Get only the messages appended after cursor position `since`.
+
+        Returns None if the window was summarized or cleared in the meantime,
+        in which case the caller must rebuild from get_messages().
+        """
+        if since < self._compacted_at:
+            return None
+        count = self._cursor - since
+        new_messages = self._messages[len(self._messages) - count:] if count else []
+        if include_tools:
+            return new_messages
+        return self._filter_tool_messages(new_messages)
+
+    @staticmethod
+    def _filter_tool_messages(raw_messages: list[dict]) -> list[dict]:
+        """Strip 'tool' messages and 'tool_calls' from assistant messages."""
+        result = []
         for msg in raw_messages:
             role = msg.get("role")
             
@@ -127,6 +157,7 @@ class ContextManager:
         self._token_counts.append(tokens)
         self._total_tokens += tokens
         self._full_history.append(message)
+        self._cursor += 1
 
         self.logger.debug(
             f"Added message: role={message['role']}, "
@@ -176,17 +207,32 @@ class ContextManager:
 
         return tokens
 
+    def _pinned_count(self) -> int:
+        """Number of leading system messages (the system prompt) kept out of summaries."""
+        count = 0
+        for msg in self._messages:
+            if msg.get("role") != "system":
+                break
+            count += 1
+        return count
+
+    def get_pinned_messages(self) -> list[dict]:
+        """Get the pinned leading system messages (stable prompt prefix)."""
+        return self._messages[:self._pinned_count()]
+
     def _auto_summarize(self):
         """
         Summarize older messages to free up context.
         Keeps the system prompt and last N messages in full.
         """
-        if len(self._messages) <= 4:
+        pinned = self._pinned_count()
+        body = self._messages[pinned:]
+        if len(body) <= 4:
             return  # Not enough to summarize
 
         keep_recent = 6  # Keep last 6 messages in full
-        to_summarize = self._messages[:-keep_recent]
-        to_keep = self._messages[-keep_recent:]
+        to_summarize = body[:-keep_recent]
+        to_keep = self._messages[:pinned] + body[-keep_recent:]
 
         if not to_summarize:
             return
@@ -209,6 +255,7 @@ class ContextManager:
         # Replace messages with just the recent ones
         old_total = self._total_tokens
         self._messages = to_keep
+        self._compacted_at = self._cursor
         self._token_counts = [self._count_message_tokens(m) for m in to_keep]
         self._total_tokens = sum(self._token_counts) + estimate_tokens(self._summary)
 
@@ -234,6 +281,7 @@ class ContextManager:
         self._token_counts.clear()
         self._total_tokens = 0
         self._summary = ""
+        self._compacted_at = self._cursor
         self.logger.info("Context cleared")
 
     def needs_new_chat(self) -> bool:
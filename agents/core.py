@@ -5,11 +5,21 @@ The main brain: Receive → Enhance → Plan → Execute → Observe → Respond
 Created: 2026-02-15
 """
 
+import asyncio
+import atexit
+import queue
 import threading
-import json
+import hashlib
+import logging
 import time
 import re
 import base64
+import fnmatch
+import functools
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 from typing import Callable, Generator
 
@@ -17,16 +27,298 @@ from memory.chat_store import ChatStore
 from agents.context_manager import ContextManager
 from agents.model_selector import ModelSelector
 from agents.prompt_enhancer import PromptEnhancer
-from config.settings import MODEL_REGISTRY
+from config.settings import AUTONOMY_SETTINGS, MODEL_REGISTRY, TELEGRAM_BOT_TOKEN
 from providers import get_llm
 from tools import create_tool_registry
 from tools.base import ToolRegistry
+from tools.screen import ScreenCaptureTool
 from utils.logger import get_logger
+from utils import fast_json
 from utils.helpers import generate_id
+from utils.stream_batcher import StreamBatcher
+
+try:
+    from skills.telegram import TelegramSendTool
+except ImportError:  # Optional: Telegram notifications
+    TelegramSendTool = None
 
 logger = get_logger("agents.core")
 
 MAX_TOOL_ITERATIONS = 25  # Allow enough rounds for full project builds
+FALLBACK_MODEL = "llama-3.3-70b"  # NVIDIA model used when another provider fails
+
+# Precompiled patterns (hot path: every turn / every tool call)
+_IMG_TAG_RE = re.compile(r'\[Attached Image: (.*?)\]')
+_CD_SPLIT_RE = re.compile(r'&&|;')
+_ABS_PATH_RE = re.compile(r'(?:^|\s)(/[^\s]+)')
+
+_MIME_BY_EXT = {
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+}
+
+
+# Always blocked, even inside an /auto scoped directory
+DANGEROUS_CMDS = frozenset({
+    'rm -rf /', 'rm -rf /*', 'sudo ', 'shutdown', 'reboot',
+    'mkfs', 'dd if=', ':(){', 'halt', 'chmod 777 /',
+    'rm -rf ~', 'rm -rf $HOME',
+})
+
+# Shell operators that chain or redirect (never "safe")
+UNSAFE_OPS = ('&&', '||', ';', '|', '>', '<', '`', '$(')
+
+# Whitelisted safe read-only commands
+SAFE_CMDS = frozenset({
+    'ls', 'pwd', 'echo', 'cat', 'git status', 'git log', 'git diff',
+    'grep', 'find', 'which', 'whoami', 'date', 'tree', 'head', 'tail', 'less'
+})
+
+
+@functools.lru_cache(maxsize=32)
+def _model_supports_tools(model: str) -> bool:
+    """Whether a registered model accepts function calling (registry is static)."""
+    return MODEL_REGISTRY.get(model, {}).get("supports_tools", False)
+
+
+@functools.lru_cache(maxsize=4)
+def _compile_patterns(patterns: tuple[str, ...]) -> re.Pattern | None:
+    """Compile glob-style auto-approve patterns into a single alternation regex."""
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns))
+
+
+def matches_auto_approve(cmd: str, patterns: list[str]) -> bool:
+    """Check if command matches any auto-approve pattern from settings."""
+    if not cmd:
+        return False
+    compiled = _compile_patterns(tuple(patterns))
+    return bool(compiled and compiled.match(cmd.strip()))
+
+
+def is_safe_command(cmd: str) -> bool:
+    """Check if a terminal command is safe (read-only)."""
+    if not cmd:
+        return False
+    # Unsafe operators: chaining or redirecting
+    for op in UNSAFE_OPS:
+        if op in cmd:
+            return False
+
+    words = cmd.split()
+    if not words:
+        return False
+
+    # Check for two-word safe commands like git status
+    if len(words) >= 2 and " ".join(words[:2]) in SAFE_CMDS:
+        return True
+
+    return words[0] in SAFE_CMDS
+
+
+def is_auto_approved(cmd: str, working_dir: str | None, auto_dir: str | None,
+                     auto_session_active: bool) -> bool:
+    """Check if command is safe to auto-run within the /auto scoped directory."""
+    if not auto_session_active or not auto_dir:
+        return False
+
+    # Always block dangerous commands even in auto mode
+    cmd_lower = cmd.lower().strip()
+    for d in DANGEROUS_CMDS:
+        if d in cmd_lower:
+            return False
+
+    scope = _resolve_scope(auto_dir)
+
+    # Extract effective working directory
+    # Handle compound commands: "cd /path && cmd" or "cd /path; cmd"
+    resolved_cwd = working_dir or os.getcwd()
+    for part in _CD_SPLIT_RE.split(cmd):
+        part = part.strip()
+        if part.startswith('cd '):
+            cd_target = part[3:].strip().strip('"').strip("'")
+            resolved_cwd = os.path.join(resolved_cwd, os.path.expanduser(cd_target))
+
+    # Working directory must be within the auto scope
+    if not _in_scope(os.path.realpath(resolved_cwd), scope):
+        return False
+
+    # Every absolute path the command references must be within scope too
+    return all(
+        _in_scope(os.path.realpath(p), scope) for p in _ABS_PATH_RE.findall(cmd)
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _resolve_scope(auto_dir: str) -> str:
+    """Resolve the /auto directory once per session (symlinks included)."""
+    return os.path.realpath(auto_dir)
+
+
+def _in_scope(path: str, scope: str) -> bool:
+    """Path-component containment check (so /tmp/foobar is not inside /tmp/foo)."""
+    return path == scope or path.startswith(scope.rstrip(os.sep) + os.sep)
+
+
+class _LogWriter:
+    """
+    Appends project log entries from a background thread.
+
+    Entries are queued by the agent loop and written in ~100ms batches to
+    files held open for the session, so tool calls never wait on disk I/O.
+    Pending entries are flushed at interpreter exit.
+    """
+
+    def __init__(self, interval: float = 0.1):
+        self._interval = interval
+        self._queue: queue.Queue = queue.Queue()
+        self._files: dict[Path, object] = {}
+        self._write_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        atexit.register(self.flush)
+
+    def enqueue(self, path: Path, entry: str, header: str = ""):
+        """Queue an entry; the header is written only if the file is new."""
+        self._queue.put((path, entry, header))
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="mragent-project-log", daemon=True
+                    )
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            time.sleep(self._interval)  # Let the batch fill up
+            self._write_batch([item])
+
+    def flush(self):
+        """Write all pending entries now."""
+        self._write_batch([])
+
+    def _write_batch(self, batch: list):
+        with self._write_lock:
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for path, entry, header in batch:
+                try:
+                    f = self._files.get(path)
+                    if f is None:
+                        path.parent.mkdir(parents=True, exist_ok=True)
+                        is_new = not path.exists()
+                        f = open(path, "a", buffering=8192, encoding="utf-8")
+                        self._files[path] = f
+                        if is_new and header:
+                            f.write(header)
+                    f.write(entry)
+                except Exception as e:
+                    logger.debug(f"Project log write failed: {e}")
+
+            for f in self._files.values():
+                try:
+                    f.flush()
+                except Exception:
+                    pass
+
+
+_PROJECT_LOG = _LogWriter()
+
+# Approval notifications reuse one small pool and one Telegram sender
+_NOTIFY_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mragent-notify")
+_telegram_sender = None
+_telegram_sender_lock = threading.Lock()
+
+
+def _get_telegram_sender():
+    """Lazily create the shared Telegram send tool (None if unavailable)."""
+    global _telegram_sender
+    if _telegram_sender is None and TelegramSendTool is not None:
+        with _telegram_sender_lock:
+            if _telegram_sender is None:
+                _telegram_sender = TelegramSendTool()
+    return _telegram_sender
+
+
+def _send_approval_notification(tool_name: str, command: str):
+    """Notify every allowed Telegram chat that an approval is pending."""
+    try:
+        sender = _get_telegram_sender()
+        allowed_chats = [
+            c.strip() for c in os.getenv("ALLOWED_TELEGRAM_CHATS", "").split(",") if c.strip()
+        ]
+        if sender is None or not allowed_chats:
+            return
+        msg = (
+            f"⚠️ *MRAgent Approval Pending*\n\n"
+            f"Tool: `{tool_name}`\n"
+            f"Command: `{command[:200]}`\n\n"
+            f"Waiting for your approval in the terminal..."
+        )
+        for chat_id in allowed_chats:
+            sender.execute(message=msg, chat_id=chat_id)
+    except Exception as e:
+        logger.debug(f"Telegram notification failed: {e}")
+
+
+def _preview_args(func_name: str, args: dict, limit: int) -> str:
+    """
+    Short JSON preview of tool arguments. Long strings are cut before
+    serializing so large payloads (file contents, code) are never dumped
+    in full just to be sliced; write_file content is shown as a length.
+    """
+    if not isinstance(args, dict):
+        return str(args)[:limit]
+    short = {}
+    for key, value in args.items():
+        if isinstance(value, str):
+            if func_name == "write_file" and key == "content":
+                value = f"<{len(value)} chars>"
+            elif len(value) > limit:
+                value = value[:limit]
+        short[key] = value
+    return fast_json.dumps(short)[:limit]
+
+
+# Shared pool for blocking file I/O (attached images)
+_IO_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mragent-io")
+
+
+def _encode_image(img_path_str: str) -> dict | None:
+    """Load an attached image and return it as an image_url content part (None on failure)."""
+    img_path = Path(img_path_str.strip())
+    if not img_path.exists():
+        return None
+    try:
+        # Encode straight from a read-only mapping to skip the bf.read() copy
+        with open(img_path, "rb") as bf:
+            if os.fstat(bf.fileno()).st_size == 0:
+                logger.warning(f"Attached image is empty: {img_path}")
+                return None
+            with mmap.mmap(bf.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                encoded_img = base64.b64encode(mm).decode('ascii')
+
+        # Determine MIME type roughly
+        mime_type = _MIME_BY_EXT.get(img_path.suffix.lower(), "image/jpeg")
+
+        return {
+            "type": "image_url",
+            "image_url": {
+                "url": f"data:{mime_type};base64,{encoded_img}"
+            }
+        }
+    except Exception as e:
+        logger.error(f"Failed to read attached image {img_path}: {e}")
+        return None
 
 
 class AgentCore:
@@ -58,6 +350,7 @@ class AgentCore:
         self._response_callbacks: list[Callable] = []
         self.approval_callback: Callable[[str], bool] = None
         self._lock = threading.Lock()
+        self._lock_contended = 0
 
         # Initialize with system prompt
         system_msg = self.prompt_enhancer.get_system_prompt()
@@ -86,9 +379,30 @@ class AgentCore:
         
         Thread-safe: serializes access to prevent concurrent history modification.
         """
+        # Fast path: uncontended acquire
+        if self._lock.acquire(blocking=False):
+            try:
+                return self._chat_unsafe(user_message, stream)
+            finally:
+                self._lock.release()
+
+        # Another turn is in flight — record it so operators can see when
+        # callers start queueing behind a single agent, then wait our turn
+        self._lock_contended += 1
+        logger.info(f"Chat turn waiting for in-flight turn (contention #{self._lock_contended})")
         with self._lock:
             return self._chat_unsafe(user_message, stream)
 
+    async def chat_async(self, user_message: str, stream: bool = False) -> str:
+        """
+        Async variant of chat() for asyncio frontends (e.g. the Telegram bot).
+
+        The blocking turn (LLM calls + tool execution) runs in a worker thread
+        so the event loop stays free to serve other chats; turns on this agent
+        are still serialized by the same lock as chat().
+        """
+        return await asyncio.to_thread(self.chat, user_message, stream)
+
     def _chat_unsafe(self, user_message: str, stream: bool = True) -> str:
         """Internal chat logic (not thread-safe)."""
         turn_start = time.time()
@@ -97,50 +411,37 @@ class AgentCore:
         enhanced = self.prompt_enhancer.enhance_user_message(user_message)
         
         # Parse for [Attached Image: /path/to/image]
-        image_matches = re.findall(r'\[Attached Image: (.*?)\]', enhanced)
+        image_matches = _IMG_TAG_RE.findall(enhanced)
+
+        # Start loading attached images in the background so disk I/O and
+        # base64 encoding overlap with model selection
+        encoded_images = _IO_POOL.map(_encode_image, image_matches) if image_matches else None
+
+        # 2. Select model
+        model = self.model_selector.select(user_message, override=self.model_override)
+
         if image_matches:
             # Multi-modal array
             content_array = []
             
             # Remove the tags from the text part to avoid confusing the LLM with duplicate info
-            text_only = re.sub(r'\[Attached Image: .*?\]', '', enhanced).strip()
+            text_only = _IMG_TAG_RE.sub('', enhanced).strip()
             if text_only:
                 content_array.append({"type": "text", "text": text_only})
-                
-            for img_path_str in image_matches:
-                img_path = Path(img_path_str.strip())
-                if img_path.exists():
-                    try:
-                        with open(img_path, "rb") as bf:
-                            encoded_img = base64.b64encode(bf.read()).decode('utf-8')
-                            
-                        # Determine MIME type roughly
-                        ext = img_path.suffix.lower()
-                        mime_type = "image/jpeg"
-                        if ext == ".png": mime_type = "image/png"
-                        elif ext == ".webp": mime_type = "image/webp"
-                        
-                        content_array.append({
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:{mime_type};base64,{encoded_img}"
-                            }
-                        })
-                    except Exception as e:
-                        logger.error(f"Failed to read attached image {img_path}: {e}")
+
+            # Results arrive in the order the paths appeared
+            content_array.extend(part for part in encoded_images if part)
             
             if not content_array:
                 # Fallback to string if parsing failed
                 content_array = enhanced
             
             self.context_manager.add_message({"role": "user", "content": content_array})
-            self.chat_store.save_message(self.chat_id, "user", json.dumps(content_array))
+            self.chat_store.save_message(self.chat_id, "user", fast_json.dumps(content_array))
         else:
             self.context_manager.add_message({"role": "user", "content": enhanced})
             self.chat_store.save_message(self.chat_id, "user", enhanced)
 
-        # 2. Select model
-        model = self.model_selector.select(user_message, override=self.model_override)
         self.context_manager.set_model(model)
         self._emit("model", model)
 
@@ -168,19 +469,31 @@ class AgentCore:
 
         Returns the final text response after all tool calls are resolved.
         """
+        # Provider handles are process-wide singletons holding pooled clients,
+        # so one handle serves every iteration of this turn
         llm = get_llm(model=model)
-        _fallback_llm = None  # lazy-loaded NVIDIA fallback for non-NVIDIA providers
 
-        # Check if model supports tools
-        model_info = MODEL_REGISTRY.get(model, {})
-        supports_tools = model_info.get("supports_tools", False)
+        # Check if model supports tools. The schema is fixed for the whole turn
+        # (including the fallback path) so the prompt prefix stays cacheable.
+        supports_tools = _model_supports_tools(model)
         
-        tools_schema = self.tool_registry.get_openai_tools() if supports_tools else None
+        tools_schema = self._get_tools_schema(supports_tools)
         
+        # Get messages, filtering out tools if model doesn't support them
+        messages = self._build_prompt(supports_tools, tools_schema)
+        cursor = self.context_manager.cursor
+
         # Max tools limit
         for iteration in range(MAX_TOOL_ITERATIONS):
-            # Get messages, filtering out tools if model doesn't support them
-            messages = self.context_manager.get_messages(include_tools=supports_tools)
+            if iteration:
+                # Append only what the last tool cycle added; rebuild if the
+                # context was summarized in the meantime
+                delta = self.context_manager.get_messages_delta(cursor, include_tools=supports_tools)
+                if delta is None:
+                    messages = self._build_prompt(supports_tools, tools_schema)
+                else:
+                    messages.extend(delta)
+                cursor = self.context_manager.cursor
 
             logger.debug(f"Agent loop iteration {iteration + 1}, messages: {len(messages)}")
 
@@ -209,19 +522,16 @@ class AgentCore:
                         f"⚠️ {provider_name} unavailable ({type(e).__name__}). "
                         f"Falling back to NVIDIA..."
                     )
-                    from providers import get_llm as _get_llm
-                    llm = _get_llm()           # always returns NVIDIA
-                    _fallback_llm = llm
-                    fallback_model = "llama-3.3-70b"
-                    model_info = MODEL_REGISTRY.get(fallback_model, {})
-                    supports_tools = model_info.get("supports_tools", True)
-                    tools_schema = self.tool_registry.get_openai_tools() if supports_tools else None
+                    # Stay on the fallback for the rest of the turn so later
+                    # tool iterations don't retry the failed provider/model
+                    llm = get_llm()            # always returns NVIDIA
+                    model = FALLBACK_MODEL
                     if stream:
-                        response = self._handle_streaming(llm, messages, fallback_model, tools_schema)
+                        response = self._handle_streaming(llm, messages, model, tools_schema)
                     else:
                         response = llm.chat(
                             messages=messages,
-                            model=fallback_model,
+                            model=model,
                             stream=False,
                             tools=tools_schema,
                             temperature=0.7,
@@ -229,6 +539,10 @@ class AgentCore:
                 else:
                     raise  # NVIDIA itself failed — let the outer handler deal with it
 
+            cached_tokens = response.get("usage", {}).get("cached_tokens")
+            if cached_tokens:
+                logger.debug(f"Prompt cache hit: {cached_tokens} tokens")
+
             # Check for tool calls
             tool_calls = response.get("tool_calls", [])
 
@@ -244,11 +558,38 @@ class AgentCore:
         logger.warning(f"Agent loop hit max iterations ({MAX_TOOL_ITERATIONS})")
         return "I've made too many tool calls in this turn. Let me give you what I have so far."
 
+    def _get_tools_schema(self, supports_tools: bool) -> list[dict] | None:
+        """Return the tool schema (cached by the registry until it changes)."""
+        return self.tool_registry.get_openai_tools() if supports_tools else None
+
+    def _build_prompt(self, supports_tools: bool, tools_schema: list | None) -> list[dict]:
+        """
+        Assemble the request messages in a fixed, append-only order:
+        [system][summary][...prior turns...][current user][current tool cycle].
+
+        Earlier segments are never reordered, so providers with prompt caching
+        can reuse the prefix. The sha256 of the stable prefix (tools + static
+        system prompt head) is logged at DEBUG so cache-breaking changes show up.
+        """
+        messages = self.context_manager.get_messages(include_tools=supports_tools)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            digest = hashlib.sha256()
+            if tools_schema:
+                digest.update(self.tool_registry.get_openai_tools_json_bytes())
+            digest.update(self.prompt_enhancer.static_head_bytes)
+            logger.debug(f"Prompt prefix sha256={digest.hexdigest()[:16]}")
+
+        return messages
+
     def _handle_streaming(self, llm, messages: list, model: str,
                           tools_schema: list) -> dict:
         """Handle a streaming response, emitting chunks and collecting the full result."""
-        full_content = ""
+        parts: list[str] = []
+        full_content = None
         tool_calls = []
+        # Coalesce token deltas so callbacks (CLI, web, Telegram) fire per batch
+        batcher = StreamBatcher(lambda text: self._emit("delta", text))
 
         stream = llm.chat(
             messages=messages,
@@ -258,22 +599,39 @@ class AgentCore:
             temperature=0.7,
         )
 
-        for chunk in stream:
-            chunk_type = chunk.get("type", "")
+        def _on_content(chunk):
+            delta = chunk.get("delta", "")
+            parts.append(delta)
+            batcher.add(delta)
+
+        def _on_tool_calls(chunk):
+            nonlocal tool_calls
+            batcher.flush()
+            tool_calls = chunk.get("tool_calls", [])
+            self._emit("tool_calls", fast_json.dumps(tool_calls))
+
+        def _on_finish(chunk):
+            nonlocal full_content, tool_calls
+            batcher.flush()
+            full_content = chunk.get("full_content")
+            if not tool_calls:
+                tool_calls = chunk.get("tool_calls", [])
 
-            if chunk_type == "content":
-                delta = chunk.get("delta", "")
-                full_content += delta
-                self._emit("delta", delta)
+        def _ignore(chunk):
+            pass
 
-            elif chunk_type == "tool_calls":
-                tool_calls = chunk.get("tool_calls", [])
-                self._emit("tool_calls", json.dumps(tool_calls))
+        handlers = {
+            "content": _on_content,
+            "tool_calls": _on_tool_calls,
+            "finish": _on_finish,
+        }.get
+
+        for chunk in stream:
+            handlers(chunk.get("type"), _ignore)(chunk)
 
-            elif chunk_type == "finish":
-                full_content = chunk.get("full_content", full_content)
-                if not tool_calls:
-                    tool_calls = chunk.get("tool_calls", [])
+        batcher.flush()
+        if full_content is None:
+            full_content = "".join(parts)
 
         return {
             "content": full_content,
@@ -283,9 +641,6 @@ class AgentCore:
 
     def _execute_tool_calls(self, tool_calls: list, assistant_response: dict):
         """Execute tool calls and add results to conversation context."""
-        from config.settings import AUTONOMY_SETTINGS
-        import fnmatch
-
         # Normalize tool_calls: ensure each has "type": "function" (required by NVIDIA API)
         normalized_tool_calls = []
         for tc in tool_calls:
@@ -309,114 +664,35 @@ class AgentCore:
             tool_calls=normalized_tool_calls
         )
 
+        # Read settings once per batch of tool calls
         trust_level = AUTONOMY_SETTINGS.get("trust_level", "balanced")
-
-        for tc in tool_calls:
-            func_name = tc.get("function", {}).get("name", "")
-            func_args_str = tc.get("function", {}).get("arguments", "{}")
-            tc_id = tc.get("id", generate_id("tc_"))
-
-            # Parse arguments
-            try:
-                func_args = json.loads(func_args_str)
-            except json.JSONDecodeError:
+        auto_approve_patterns = AUTONOMY_SETTINGS.get("auto_approve_patterns", [])
+        auto_dir = AUTONOMY_SETTINGS.get("auto_directory")
+        auto_session_active = AUTONOMY_SETTINGS.get("auto_session_active", False)
+
+        for tc, normalized in zip(tool_calls, normalized_tool_calls):
+            function = tc.get("function", {})
+            func_name = function.get("name", "")
+            raw_args = function.get("arguments", "{}")
+            tc_id = normalized["id"]  # Must match the id recorded on the assistant message
+
+            # Parse arguments (some providers already hand back a dict)
+            if isinstance(raw_args, dict):
+                func_args = raw_args
+            elif not raw_args:
                 func_args = {}
-                logger.warning(f"Failed to parse tool args: {func_args_str[:100]}")
+            else:
+                try:
+                    func_args = fast_json.loads(raw_args)
+                except (fast_json.JSONDecodeError, TypeError):
+                    func_args = {}
+                    logger.warning(f"Failed to parse tool args: {str(raw_args)[:100]}")
 
-            self._emit("tool_start", f"🔧 Running: {func_name}({json.dumps(func_args)[:100]})")
+            self._emit("tool_start", f"🔧 Running: {func_name}({_preview_args(func_name, func_args, 100)})")
 
             # Execute the tool with tiered approval logic
             result = None
 
-            # Helper: check if a command matches auto-approve patterns
-            def matches_auto_approve(cmd: str) -> bool:
-                """Check if command matches any auto-approve pattern from settings."""
-                if not cmd:
-                    return False
-                patterns = AUTONOMY_SETTINGS.get("auto_approve_patterns", [])
-                for pattern in patterns:
-                    if fnmatch.fnmatch(cmd.strip(), pattern):
-                        return True
-                return False
-
-            # Helper: check if a terminal command is safe (read-only)
-            def is_safe_command(cmd: str) -> bool:
-                if not cmd:
-                    return False
-                # Unsafe operators: chaining or redirecting
-                unsafe_patterns = ['&&', '||', ';', '|', '>', '<', '`', '$(']
-                for p in unsafe_patterns:
-                    if p in cmd:
-                        return False
-
-                # Extract base command
-                base_cmd = cmd.strip().split()[0] if cmd.strip() else ""
-
-                # Whitelisted safe read-only commands
-                safe_cmds = {
-                    'ls', 'pwd', 'echo', 'cat', 'git status', 'git log', 'git diff',
-                    'grep', 'find', 'which', 'whoami', 'date', 'tree', 'head', 'tail', 'less'
-                }
-
-                # Check for two-word safe commands like git status
-                if len(cmd.split()) >= 2:
-                    two_word_cmd = " ".join(cmd.split()[:2])
-                    if two_word_cmd in safe_cmds:
-                        return True
-
-                return base_cmd in safe_cmds
-
-            # Helper: check if command is allowed under /auto directory scope
-            def is_auto_approved(cmd: str, working_dir: str = None) -> bool:
-                """Check if command is safe to auto-run within the /auto scoped directory."""
-                if not AUTONOMY_SETTINGS.get("auto_session_active"):
-                    return False
-                auto_dir = AUTONOMY_SETTINGS.get("auto_directory")
-                if not auto_dir:
-                    return False
-
-                # Always block dangerous commands even in auto mode
-                dangerous = ['rm -rf /', 'rm -rf /*', 'sudo ', 'shutdown', 'reboot',
-                             'mkfs', 'dd if=', ':(){', 'halt', 'chmod 777 /',
-                             'rm -rf ~', 'rm -rf $HOME']
-                cmd_lower = cmd.lower().strip()
-                for d in dangerous:
-                    if d in cmd_lower:
-                        return False
-
-                import os
-                import re as _re
-                auto_dir_resolved = os.path.abspath(auto_dir)
-
-                # Extract effective working directory
-                # Handle compound commands: "cd /path && cmd" or "cd /path; cmd"
-                resolved_cwd = os.path.abspath(working_dir) if working_dir else os.getcwd()
-                parts = _re.split(r'&&|;', cmd)
-                for part in parts:
-                    part = part.strip()
-                    if part.startswith('cd '):
-                        cd_target = part[3:].strip().strip('"').strip("'")
-                        if os.path.isabs(cd_target):
-                            resolved_cwd = os.path.abspath(cd_target)
-                        elif cd_target.startswith('~'):
-                            resolved_cwd = os.path.abspath(os.path.expanduser(cd_target))
-                        else:
-                            resolved_cwd = os.path.abspath(os.path.join(resolved_cwd, cd_target))
-
-                # Working directory must be within the auto scope
-                if not resolved_cwd.startswith(auto_dir_resolved):
-                    return False
-
-                # Check if command references absolute paths outside the scope
-                abs_paths = _re.findall(r'(?:^|\s)(/[^\s]+)', cmd)
-                for p in abs_paths:
-                    resolved_p = os.path.abspath(p)
-                    # Allow paths within scope
-                    if not resolved_p.startswith(auto_dir_resolved):
-                        return False
-
-                return True
-
             # ── Tiered Approval Logic ──
             if func_name == "execute_terminal":
                 cmd_to_run = func_args.get("command", "")
@@ -429,11 +705,12 @@ class AgentCore:
                 elif trust_level == "balanced":
                     # Check /auto directory-scoped approval first
                     working_dir = func_args.get("working_directory")
-                    if is_auto_approved(cmd_to_run, working_dir):
-                        logger.info(f"[AUTO-SCOPE] Auto-approved in {AUTONOMY_SETTINGS.get('auto_directory')}: {cmd_to_run}")
+                    if is_auto_approved(cmd_to_run, working_dir, auto_dir, auto_session_active):
+                        logger.info(f"[AUTO-SCOPE] Auto-approved in {auto_dir}: {cmd_to_run}")
                         self._emit("info", f"⚡ [auto] Running: {cmd_to_run[:80]}")
                     # Balanced: auto-run if safe OR matches patterns; otherwise ask
-                    elif not is_safe_command(cmd_to_run) and not matches_auto_approve(cmd_to_run):
+                    elif not is_safe_command(cmd_to_run) and not matches_auto_approve(
+                            cmd_to_run, auto_approve_patterns):
                         if self.approval_callback:
                             tool_desc = f"⚠️ Agent wants to run a command:\n```bash\n{cmd_to_run}\n```"
                             self._emit("approval_required", tool_desc)
@@ -494,7 +771,6 @@ class AgentCore:
 
     def _log_to_project(self, tool_name: str, tool_args: dict, result: str):
         """Log tool actions to .mragent/log.md in the auto directory for debugging."""
-        from config.settings import AUTONOMY_SETTINGS
         if not AUTONOMY_SETTINGS.get("auto_session_active"):
             return
         auto_dir = AUTONOMY_SETTINGS.get("auto_directory")
@@ -502,10 +778,7 @@ class AgentCore:
             return
 
         try:
-            from datetime import datetime
-            log_dir = Path(auto_dir) / ".mragent"
-            log_dir.mkdir(exist_ok=True)
-            log_file = log_dir / "log.md"
+            log_file = Path(auto_dir) / ".mragent" / "log.md"
 
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
@@ -515,7 +788,7 @@ class AgentCore:
             elif tool_name == "write_file":
                 args_display = f"path={tool_args.get('path', '')}, {len(tool_args.get('content', ''))} chars"
             else:
-                args_display = str(tool_args)[:200]
+                args_display = _preview_args(tool_name, tool_args, 200)
 
             # Truncate result for log
             result_preview = result[:500] if result else "(no output)"
@@ -527,45 +800,20 @@ class AgentCore:
                 f"---\n"
             )
 
-            # Write header if new file
-            if not log_file.exists():
-                with open(log_file, "w") as f:
-                    f.write(f"# MRAgent Project Log\n\nAuto-generated action log for `{auto_dir}`\n\n---\n")
-
-            with open(log_file, "a") as f:
-                f.write(entry)
+            header = f"# MRAgent Project Log\n\nAuto-generated action log for `{auto_dir}`\n\n---\n"
+            _PROJECT_LOG.enqueue(log_file, entry, header)
 
         except Exception as e:
             logger.debug(f"Project log write failed: {e}")
 
     def _notify_pending_approval(self, tool_name: str, command: str):
         """Send a Telegram notification when an approval is pending (balanced mode)."""
-        from config.settings import AUTONOMY_SETTINGS, TELEGRAM_BOT_TOKEN
         if not AUTONOMY_SETTINGS.get("notify_on_pending", False) or not TELEGRAM_BOT_TOKEN:
             return
 
         try:
-            import threading
-            def _send():
-                try:
-                    from skills.telegram import TelegramSkill
-                    skill = TelegramSkill()
-                    allowed_chats = skill.allowed_chats
-                    if not allowed_chats:
-                        return
-                    msg = (
-                        f"⚠️ *MRAgent Approval Pending*\n\n"
-                        f"Tool: `{tool_name}`\n"
-                        f"Command: `{command[:200]}`\n\n"
-                        f"Waiting for your approval in the terminal..."
-                    )
-                    for chat_id in allowed_chats:
-                        skill._send_message(chat_id, msg)
-                except Exception as e:
-                    logger.debug(f"Telegram notification failed: {e}")
-
-            # Fire-and-forget in a thread to not block the approval prompt
-            threading.Thread(target=_send, daemon=True).start()
+            # Fire-and-forget on the shared pool to not block the approval prompt
+            _NOTIFY_POOL.submit(_send_approval_notification, tool_name, command)
         except Exception:
             pass
 
@@ -616,6 +864,7 @@ class AgentCore:
             "model_mode": self.model_selector.mode,
             "model_override": self.model_override,
             "tools": self.tool_registry.count,
+            "lock_contended": self._lock_contended,
             "context": self.context_manager.get_stats(),
         }
 
@@ -630,9 +879,6 @@ class AgentCore:
         Returns:
             Text analysis/guidance from the vision model.
         """
-        from tools.screen import ScreenCaptureTool
-        from providers import get_llm
-
         screen_tool = ScreenCaptureTool()
         llm = get_llm()
 
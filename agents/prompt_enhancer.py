@@ -5,10 +5,12 @@ Builds system prompts, injects context, and enhances user queries.
 Created: 2026-02-15
 """
 
-from datetime import datetime
+import os
+import re
+import time
 
 from utils.logger import get_logger
-from utils.helpers import get_system_context
+from utils.helpers import get_static_system_context
 
 logger = get_logger("agents.prompt_enhancer")
 
@@ -108,6 +110,17 @@ When the user asks you to **build, create, or implement** something (a project,
 {context}
 """
 
+# Everything above this marker is static for the lifetime of the process
+_CONTEXT_MARKER = "## Current Context"
+
+# Image prompts that already ask for quality don't get boosters appended
+_QUALITY_TOKENS = (
+    "high quality", "detailed", "sharp focus",
+    "professional", "4k resolution",
+)
+_QUALITY_RE = re.compile("|".join(map(re.escape, _QUALITY_TOKENS)), re.IGNORECASE)
+_QUALITY_SUFFIX = ", high quality, detailed, sharp focus"
+
 
 class PromptEnhancer:
     """
@@ -117,23 +130,50 @@ class PromptEnhancer:
     def __init__(self):
         self.logger = get_logger("agents.prompt_enhancer")
         self._custom_instructions: str = ""
+        # Identity and guidelines never change mid-session — format them once
+        self._static_head: str = SYSTEM_PROMPT.split(_CONTEXT_MARKER)[0].format(
+            agent_name=AGENT_NAME,
+            user_name=USER_NAME,
+        )
+        # Encoded once for prefix hashing; identical bytes on every turn
+        self._static_head_bytes: bytes = self._static_head.encode("utf-8")
+        self._custom_tail: str = ""
+        # OS/user/home don't change mid-session; only the cwd is read per call
+        self._static_ctx: str = get_static_system_context()
+        # Timestamp string is only re-rendered when the second changes
+        self._last_ts_second: int = 0
+        self._last_ts_str: str = ""
+
+    @property
+    def static_head_bytes(self) -> bytes:
+        """UTF-8 bytes of the static (cacheable) head of the system prompt."""
+        return self._static_head_bytes
 
     def get_system_prompt(self) -> dict:
         """Build the full system prompt with current context."""
-        context = get_system_context()
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        context += f"\nTimestamp: {now}"
-        content = SYSTEM_PROMPT.format(
-            context=context,
-            agent_name=AGENT_NAME,
-            user_name=USER_NAME
+        context = f"{self._static_ctx}\nCWD: {os.getcwd()}"
+        now = self._timestamp()
+        # Static first, volatile last: the timestamp trails everything else
+        content = (
+            f"{self._static_head}{_CONTEXT_MARKER}\n{context}\n"
+            f"{self._custom_tail}"
+            f"\n\n## Turn Metadata\nTimestamp: {now}\n"
         )
 
-        if self._custom_instructions:
-            content += f"\n\n## User Custom Instructions\n{self._custom_instructions}"
-
         return {"role": "system", "content": content}
 
+    def _timestamp(self) -> str:
+        """Local time as YYYY-MM-DD HH:MM:SS, cached for the current second."""
+        second = int(time.time())
+        if second != self._last_ts_second:
+            self._last_ts_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+            self._last_ts_second = second
+        return self._last_ts_str
+
+    def refresh_context(self):
+        """Re-read the cached system context (e.g. after the environment changed)."""
+        self._static_ctx = get_static_system_context()
+
     def enhance_user_message(self, message: str) -> str:
         """
         Enhance a user message if it's too vague.
@@ -150,6 +190,9 @@ class PromptEnhancer:
     def set_custom_instructions(self, instructions: str):
         """Set custom user instructions to include in system prompt."""
         self._custom_instructions = instructions
+        self._custom_tail = (
+            f"\n\n## User Custom Instructions\n{instructions}" if instructions else ""
+        )
         self.logger.info(f"Custom instructions set ({len(instructions)} chars)")
 
     def build_image_prompt(self, user_prompt: str) -> str:
@@ -157,15 +200,8 @@ class PromptEnhancer:
         Enhance an image generation prompt for better results.
         Adds quality boosters that work well with SD 3.5 / FLUX.
         """
-        quality_tokens = [
-            "high quality", "detailed", "sharp focus",
-            "professional", "4k resolution",
-        ]
-
         # Don't add boosters if user already specified quality
-        has_quality = any(q in user_prompt.lower() for q in quality_tokens)
-
-        if not has_quality:
-            user_prompt += ", high quality, detailed, sharp focus"
+        if not _QUALITY_RE.search(user_prompt):
+            user_prompt += _QUALITY_SUFFIX
 
         return user_prompt
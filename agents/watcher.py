@@ -10,6 +10,7 @@ Uses:
 Created: 2026-02-19
 """
 
+import sys
 import time
 import asyncio
 import subprocess
@@ -18,23 +19,29 @@ from pathlib import Path
 from tempfile import gettempdir
 
 from tools.screen import ScreenCaptureTool
-from providers.nvidia_llm import NvidiaLLMProvider
+from providers import get_llm
 from providers.tts import text_to_speech
 from utils.logger import get_logger
 
 logger = get_logger("agents.eagle_eye")
 
 class EagleEyeWatcher:
-    def __init__(self, interval: float = 3.0, diff_threshold: float = 5.0):
+    def __init__(self, interval: float = 3.0, diff_threshold: float = 5.0,
+                 hash_threshold: int = 10, min_analysis_gap: float = 5.0):
         self.interval = interval
         self.diff_threshold = diff_threshold
+        self.hash_threshold = hash_threshold  # dHash bits (0-64) that count as a change
+        self.min_analysis_gap = min_analysis_gap  # Seconds between VLM calls
         self.running = False
         
         self.screen_tool = ScreenCaptureTool()
-        self.llm = NvidiaLLMProvider()
+        # Shared provider singleton — reuses its pooled keep-alive clients
+        self.llm = get_llm()
         
-        self.last_frame_b64 = None
+        self.last_thumb = None  # Grayscale uint8 thumbnail of the reference frame
+        self.last_hash = None   # 64-bit dHash of the reference frame
         self.last_analysis_time = 0
+        self._analysis_task: asyncio.Task | None = None  # At most one VLM call in flight
         
         # Audio output path
         self.audio_file = Path(gettempdir()) / "mragent_eagle_eye.mp3"
@@ -65,54 +72,89 @@ class EagleEyeWatcher:
         """Main monitoring loop."""
         print("Waiting for screen activity...")
         
+        # Absolute monotonic schedule so jitter doesn't accumulate into drift
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        
         while self.running:
-            start_time = time.time()
+            next_tick += self.interval
             
-            # 1. Capture for Diff (Low Quality, Grayscale)
-            current_b64 = self.screen_tool.capture_as_base64(
-                quality=50, resize_factor=0.5, grayscale=True
-            )
+            # 1. Capture once; the diff and analysis renditions both come from this frame
+            raw = self.screen_tool.capture_raw()
+            current_thumb = None
+            if raw is not None:
+                # Small grayscale thumbnail for the diff (no JPEG encode/decode)
+                current_thumb = self.screen_tool.thumb_gray(raw)
             
-            if not current_b64:
+            if current_thumb is None:
                 logger.warning("Screen capture failed (returned None). Retrying...")
-                await asyncio.sleep(self.interval)
+                next_tick = await self._sleep_until(loop, next_tick)
                 continue
             
-            # 2. Check Diff
-            diff = self.screen_tool.calculate_diff(self.last_frame_b64, current_b64)
+            # 2. Check Diff — dHash Hamming distance first, pixel diff for close calls
+            current_hash = self.screen_tool.dhash(current_thumb)
+            hamming = None
+            if self.last_hash is not None and current_hash is not None:
+                hamming = (self.last_hash ^ current_hash).bit_count()
+
+            if hamming == 0:
+                # Identical hash — idle screen, skip the pixel diff entirely
+                changed, detail = False, "0/64 hash bits"
+            elif hamming is not None and hamming > self.hash_threshold:
+                changed, detail = True, f"{hamming}/64 hash bits"
+            else:
+                diff = self.screen_tool.thumb_diff(self.last_thumb, current_thumb)
+                changed, detail = diff > self.diff_threshold, f"{diff:.1f}%"
             
-            if diff > self.diff_threshold:
-                logger.info(f"Movement detected! Diff: {diff:.1f}%")
-                print(f"👁️  Activity detected ({diff:.1f}%) — Analyzing...")
+            analysis_busy = (
+                (self._analysis_task is not None and not self._analysis_task.done())
+                or time.time() - self.last_analysis_time < self.min_analysis_gap
+            )
+
+            if changed and not analysis_busy:
+                logger.info(f"Movement detected! Diff: {detail}")
+                print(f"👁️  Activity detected ({detail}) — Analyzing...")
                 
-                # 3. Analyze High-Res Frame
-                await self._analyze_scene()
+                # 3. Analyze High-Res Frame in the background so capture keeps
+                # its cadence while the VLM call is in flight
+                self._analysis_task = asyncio.create_task(self._analyze_scene(raw))
                 
-                # Update reference frame ONLY after successful analysis
+                # Update reference frame ONLY when an analysis is started
                 # to prevent analyzing the same change twice if it persists
-                self.last_frame_b64 = current_b64
+                self.last_thumb = current_thumb
+                self.last_hash = current_hash
                 self.last_analysis_time = time.time()
             else:
-                # No change, just update reference to handle slow drift?
+                # No change (or analysis still running), just update reference to handle slow drift?
                 # No, keep old reference to detect cumulative change.
                 pass
 
             # Update last frame if it was None (first run)
-            if self.last_frame_b64 is None:
-                self.last_frame_b64 = current_b64
+            if self.last_thumb is None:
+                self.last_thumb = current_thumb
+                self.last_hash = current_hash
 
-            # Sleep remaining time
-            elapsed = time.time() - start_time
-            sleep_time = max(0.1, self.interval - elapsed)
-            await asyncio.sleep(sleep_time)
+            # Sleep until the next scheduled tick
+            next_tick = await self._sleep_until(loop, next_tick)
 
-    async def _analyze_scene(self):
-        """Send high-quality frame to VLM and speak result."""
+    @staticmethod
+    async def _sleep_until(loop, tick: float) -> float:
+        """Sleep until loop time `tick`; if already past it, restart the schedule from now."""
+        delay = tick - loop.time()
+        if delay <= 0:
+            # Overran the interval — don't fire a burst of catch-up ticks
+            await asyncio.sleep(0)
+            return loop.time()
+        await asyncio.sleep(delay)
+        return tick
+
+    async def _analyze_scene(self, raw):
+        """Send high-quality rendition of the captured frame to VLM and speak result."""
         try:
-            # Capture High-Res (but resized to 1024px max for speed)
-            hq_b64 = self.screen_tool.capture_as_base64(
-                quality=80, resize_factor=0.8, grayscale=False
-            )
+            # Re-encode the same frame at the VLM's input size (off the event loop)
+            hq_b64 = await asyncio.to_thread(self.screen_tool.encode_for_vlm, raw)
+            if not hq_b64:
+                return
             
             # Prepare message
             messages = [
@@ -130,10 +172,9 @@ class EagleEyeWatcher:
             
             # Call Llama 3.2 Vision
             # Note: We must ensure this model ID is mapped correctly in settings
-            response = self.llm.chat(
+            response = await self.llm.achat(
                 messages, 
                 model="llama-3.2-11b-vision",
-                stream=False,
                 max_tokens=100
             )
             
@@ -151,7 +192,8 @@ class EagleEyeWatcher:
         """Generate and play TTS."""
         path = await text_to_speech(text, str(self.audio_file))
         if path:
-            self._play_audio(path)
+            # Playback blocks until the clip ends — keep it off the event loop
+            await asyncio.to_thread(self._play_audio, path)
 
     def _play_audio(self, path: str):
         """Play audio file using system CLI tools."""
@@ -166,6 +208,5 @@ class EagleEyeWatcher:
 
 if __name__ == "__main__":
     # Test run
-    import sys
     watcher = EagleEyeWatcher()
     watcher.start()
@@ -8,14 +8,20 @@ instead of just:
     mragent
 """
 import sys
+import importlib.util
 from pathlib import Path
 
-# Ensure the project root (site-packages or repo root) is on sys.path
-_HERE = Path(__file__).parent.parent
-if str(_HERE) not in sys.path:
-    sys.path.insert(0, str(_HERE))
-
-from main import main
+# main.py ships next to this package (py_modules=["main"] when installed, the
+# repo root in a checkout). Load it by location rather than by name, so an
+# unrelated main.py in the current directory can't shadow it and sys.path
+# stays untouched.
+_spec = importlib.util.spec_from_file_location(
+    "main", Path(__file__).resolve().parent.parent / "main.py"
+)
+_main_module = importlib.util.module_from_spec(_spec)
+sys.modules["main"] = _main_module
+_spec.loader.exec_module(_main_module)
+main = _main_module.main
 
 if __name__ == "__main__":
     sys.exit(main())
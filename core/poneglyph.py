@@ -16,6 +16,7 @@ import json
 import logging
 import platform
 import subprocess
+import time
 import traceback
 from pathlib import Path
 from typing import Dict, List, Optional, Any
@@ -26,6 +27,18 @@ logger = logging.getLogger("core.poneglyph")
 
 CONFIG_FILE = DATA_DIR / "mragent.json"
 
+# Last healthy check_health() result, reused by startup for HEALTH_CACHE_TTL seconds
+HEALTH_CACHE_FILE = DATA_DIR / ".poneglyph_cache.json"
+HEALTH_CACHE_TTL = 300
+
+# Files whose change invalidates the cached result
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+_HEALTH_INPUTS = (
+    _REPO_ROOT / "config" / "settings.py",
+    _APP_DATA_DIR / ".env",
+    _REPO_ROOT / "requirements.txt",
+)
+
 class Poneglyph:
     def __init__(self):
         self.config = self.load_config()
@@ -56,8 +69,21 @@ class Poneglyph:
             logger.error(f"Failed to read Poneglyph config: {e}")
             return {}
 
-    def check_health(self) -> bool:
-        """Run all diagnostic checks and return overall health status."""
+    def check_health(self, use_cache: bool = False) -> bool:
+        """
+        Run all diagnostic checks and return overall health status.
+
+        With use_cache=True (startup guard), a healthy result recorded less than
+        HEALTH_CACHE_TTL seconds ago is reused as long as settings.py, .env and
+        requirements.txt haven't changed. The doctor command always runs fresh.
+        """
+        fingerprint = self._health_fingerprint()
+        if use_cache and self._load_cached_health(fingerprint):
+            logger.info("Poneglyph health check skipped (recent healthy result cached)")
+            self.issues = []
+            self.system_health = "HEALTHY"
+            return True
+
         self.issues = []
         logger.info("Reading the Poneglyph... (Running Diagnostics)")
 
@@ -78,8 +104,42 @@ class Poneglyph:
                 all_passed = False
 
         self.system_health = "HEALTHY" if all_passed else "UNHEALTHY"
+        # Only healthy results are cached — an unhealthy system is re-checked every start
+        if all_passed:
+            self._save_cached_health(fingerprint)
         return all_passed
 
+    @staticmethod
+    def _health_fingerprint() -> list:
+        """mtime_ns of each health input (None if missing)."""
+        stamps = []
+        for path in _HEALTH_INPUTS:
+            try:
+                stamps.append(path.stat().st_mtime_ns)
+            except OSError:
+                stamps.append(None)
+        return stamps
+
+    @staticmethod
+    def _load_cached_health(fingerprint: list) -> bool:
+        """True if a fresh healthy result for this fingerprint is on disk."""
+        try:
+            cache = json.loads(HEALTH_CACHE_FILE.read_text())
+        except (OSError, ValueError):
+            return False
+        return (
+            time.time() - cache.get("ts", 0) < HEALTH_CACHE_TTL
+            and cache.get("inputs") == fingerprint
+        )
+
+    @staticmethod
+    def _save_cached_health(fingerprint: list):
+        """Record a healthy result; failures only cost the next startup a re-check."""
+        try:
+            HEALTH_CACHE_FILE.write_text(json.dumps({"ts": time.time(), "inputs": fingerprint}))
+        except OSError as e:
+            logger.debug(f"Could not write Poneglyph health cache: {e}")
+
     def _check_environment(self) -> bool:
         """Verify environment variables."""
         # Check for .env file
@@ -20,15 +20,16 @@ import os
 import argparse
 from pathlib import Path
 
-# Ensure project root is on path
-sys.path.insert(0, str(Path(__file__).parent))
+# Ensure project root is importable; append so an installed copy never
+# puts site-packages ahead of the stdlib
+_ROOT = str(Path(__file__).resolve().parent)
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
 
 from utils.logger import get_logger
 from config.settings import (
     DEFAULTS, validate_config, save_config_backup, SYSTEM_INFO
 )
-from agents.vivrecard import VivreCard
-from core.poneglyph import Poneglyph
 
 logger = get_logger("main")
 
@@ -137,8 +138,6 @@ def print_startup_info(args: argparse.Namespace):
     """Print startup banner and configuration summary."""
     from config.settings import AGENT_NAME, USER_NAME, AUTONOMY_SETTINGS
 
-    print(BANNER)
-
     # Validate API keys
     report = validate_config()
 
@@ -148,19 +147,26 @@ def print_startup_info(args: argparse.Namespace):
     model_count = len(report["valid"])
     mode_str = f"{args.mode}" + (" +voice" if args.voice else "")
 
-    print(f"  {AGENT_NAME} v{__version__} | {SYSTEM_INFO['os']} {SYSTEM_INFO['platform']}")
-    print(f"  Mode: {mode_str} | Models: {model_count} | Trust: {trust_icons.get(trust, '❓')} {trust}")
-
+    # Build the whole banner first and write it in one call
+    lines = [
+        BANNER,
+        f"  {AGENT_NAME} v{__version__} | {SYSTEM_INFO['os']} {SYSTEM_INFO['platform']}",
+        f"  Mode: {mode_str} | Models: {model_count} | Trust: {trust_icons.get(trust, '❓')} {trust}",
+    ]
     if report["missing"]:
-        print(f"  ⚠ Missing keys: {', '.join(report['missing'][:3])}{'...' if len(report['missing']) > 3 else ''}")
+        lines.append(f"  ⚠ Missing keys: {', '.join(report['missing'][:3])}{'...' if len(report['missing']) > 3 else ''}")
     for warning in report["warnings"][:2]:
-        print(f"  ⚠ {warning}")
-    print()
-
-    # Log (not printed to console)
-    logger.info(f"MRAgent v{__version__} starting — mode={args.mode}")
-    logger.info(f"System: {SYSTEM_INFO['os']} {SYSTEM_INFO['platform']}")
-    logger.info(f"Models: {', '.join(report['valid'])}")
+        lines.append(f"  ⚠ {warning}")
+    lines.append("")
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+    # Log (not printed to console) — one record instead of three
+    logger.info(
+        f"MRAgent v{__version__} starting — mode={args.mode}\n"
+        f"System: {SYSTEM_INFO['os']} {SYSTEM_INFO['platform']}\n"
+        f"Models: {', '.join(report['valid'])}"
+    )
 
     # Save config snapshot at startup
     backup_path = save_config_backup()
@@ -170,7 +176,8 @@ def print_startup_info(args: argparse.Namespace):
     from utils.cleanup import run_startup_cleanup
     run_startup_cleanup()
 
-    # Start VivreCard Scheduler
+    # Start VivreCard Scheduler (imported here — it pulls in the cron/tool stack)
+    from agents.vivrecard import VivreCard
     vivrecard = VivreCard()
     vivrecard.start()
     logger.info("VivreCard Scheduler started in background")
@@ -196,16 +203,34 @@ def run_cli(args: argparse.Namespace):
         sys.exit(1)
 
 
+def _serve_web_app(app, port: int, debug: bool = False, use_reloader: bool = None):
+    """
+    Serve the Flask app. Uses waitress (multi-threaded production WSGI server)
+    when installed, otherwise Flask's built-in threaded server.
+    --debug always uses Flask's server so the debugger works.
+    """
+    if not debug:
+        try:
+            from waitress import serve
+        except ImportError:
+            logger.debug("waitress not installed, using Flask's built-in server")
+        else:
+            serve(app, host="0.0.0.0", port=port, threads=8)
+            return
+    app.run(host="0.0.0.0", port=port, debug=debug, use_reloader=use_reloader,
+            threaded=True)
+
+
 def run_web(args: argparse.Namespace):
     """Launch the web UI."""
     logger.info(f"Starting web UI on port {args.port}...")
     try:
         from ui.web import create_app
         app = create_app()
-        app.run(host="0.0.0.0", port=args.port, debug=args.debug)
+        _serve_web_app(app, args.port, debug=args.debug)
     except ImportError as e:
         logger.error(f"Web dependencies missing: {e}")
-        logger.info("Install with: pip install flask")
+        logger.info("Install with: pip install flask waitress")
         sys.exit(1)
 
 
@@ -229,21 +254,28 @@ def run_both(args: argparse.Namespace):
     print("  🌐 Starting Web UI in background on port %d..." % args.port)
     logger.info(f"Dual mode: starting web UI on port {args.port} + CLI")
 
+    # Build the Flask app here, not in the thread, so its imports don't race
+    # the CLI's startup for the GIL
+    app = None
+    try:
+        from ui.web import create_app
+        app = create_app()
+        # Suppress Flask's default request logging in dual mode
+        import logging as _logging
+        _logging.getLogger("werkzeug").setLevel(_logging.WARNING)
+    except Exception as e:
+        logger.error(f"Web UI failed: {e}")
+
     def _web_thread():
         try:
-            from ui.web import create_app
-            app = create_app()
-            # Suppress Flask's default request logging in dual mode
-            import logging as _logging
-            _logging.getLogger("werkzeug").setLevel(_logging.WARNING)
-            app.run(host="0.0.0.0", port=args.port, debug=False, use_reloader=False)
+            _serve_web_app(app, args.port, use_reloader=False)
         except Exception as e:
             logger.error(f"Web UI failed: {e}")
 
-    web_thread = threading.Thread(target=_web_thread, daemon=True)
-    web_thread.start()
-
-    print(f"  ✅ Web UI running at http://localhost:{args.port}")
+    if app is not None:
+        web_thread = threading.Thread(target=_web_thread, daemon=True)
+        web_thread.start()
+        print(f"  ✅ Web UI running at http://localhost:{args.port}")
     print()
 
     # Launch Telegram Bot if token is present
@@ -251,25 +283,31 @@ def run_both(args: argparse.Namespace):
     if os.getenv("TELEGRAM_BOT_TOKEN"):
         logger.info("Checks found TELEGRAM_BOT_TOKEN, starting Telegram bot in background...")
         print("  🤖 Starting Telegram Bot in background...")
-        
+
+        bot = None
+        try:
+            # Suppress telegram logs to avoid cluttering CLI
+            import logging as _logging
+            _logging.getLogger("httpx").setLevel(_logging.WARNING)
+            _logging.getLogger("telegram").setLevel(_logging.WARNING)
+
+            from ui.telegram_bot import TelegramBot
+            import asyncio
+            bot = TelegramBot()
+        except Exception as e:
+            logger.error(f"Telegram Bot failed: {e}")
+
         def _telegram_thread():
             try:
-                # Suppress telegram logs to avoid cluttering CLI
-                import logging as _logging
-                _logging.getLogger("httpx").setLevel(_logging.WARNING)
-                _logging.getLogger("telegram").setLevel(_logging.WARNING)
-                
-                from ui.telegram_bot import TelegramBot
-                bot = TelegramBot()
                 # Run async loop for telegram
-                import asyncio
                 asyncio.run(bot.run_async())
             except Exception as e:
                 logger.error(f"Telegram Bot failed: {e}")
 
-        telegram_thread = threading.Thread(target=_telegram_thread, daemon=True)
-        telegram_thread.start()
-        print("  ✅ Telegram Bot running")
+        if bot is not None:
+            telegram_thread = threading.Thread(target=_telegram_thread, daemon=True)
+            telegram_thread.start()
+            print("  ✅ Telegram Bot running")
 
     # Run CLI in foreground
     run_cli(args)
@@ -393,12 +431,16 @@ def run_identity_wizard():
 
 def main():
     """Main entry point."""
-    
-    # Initialize Poneglyph (The Guardian)
-    poneglyph = Poneglyph()
 
-    # Handle 'doctor' command early
+    # --version needs nothing else — answer before importing the heavier modules
+    if any(arg in ("--version", "-V") for arg in sys.argv[1:]):
+        print(f"MRAgent v{__version__}")
+        return
+
+    # Handle 'doctor' command early — straight from argv, no argparse needed
     if len(sys.argv) > 1 and sys.argv[1] == "doctor":
+        from core.poneglyph import Poneglyph
+        poneglyph = Poneglyph()
         if "--fix" in sys.argv:
             poneglyph.run_fixer()
         else:
@@ -406,16 +448,21 @@ def main():
             poneglyph.report()
         return
 
+    # Parse before any wizard or health check so --help and bad flags exit fast
+    args = parse_args()
+
+    # Initialize Poneglyph (The Guardian)
+    from core.poneglyph import Poneglyph
+    poneglyph = Poneglyph()
+
     # Poneglyph Guardian Check before startup
-    if not poneglyph.check_health():
+    if not poneglyph.check_health(use_cache=True):
          logger.warning("System health check reported issues. Run 'python main.py doctor' for details.")
 
     # Run startup wizard if missing keys
     run_install_wizard()
     run_identity_wizard()
 
-    args = parse_args()
-
     # Set debug logging if requested — shows all logs in terminal too
     if args.debug:
         DEFAULTS["log_level"] = "DEBUG"
@@ -5,18 +5,70 @@ Lightweight SQLite storage for conversation history.
 Created: 2026-02-15
 """
 
-import json
+import atexit
 import sqlite3
-from datetime import datetime
+import threading
 from pathlib import Path
 from contextlib import contextmanager
 
 from config.settings import CHAT_DB_PATH
 from utils.logger import get_logger
 from utils.helpers import generate_id, estimate_tokens
+from utils import fast_json
 
 logger = get_logger("memory.chat_store")
 
+# Local-time ISO timestamp computed by SQLite (same shape as datetime.isoformat())
+_NOW_SQL = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+
+# Columns needed to rebuild a message dict (see ChatStore._row_to_message)
+_MESSAGE_COLUMNS = "role, content, tool_calls, tool_call_id"
+
+# ──────────────────────────────────────────────
+# Statements
+# Defined once so every call hands sqlite3 the same string object, which its
+# per-connection statement cache reuses as an already-prepared statement.
+# ──────────────────────────────────────────────
+_SQL_INSERT_CHAT = "INSERT INTO chats (id, title) VALUES (?, ?)"
+_SQL_ENSURE_CHAT = "INSERT OR IGNORE INTO chats (id, title) VALUES (?, 'New Chat')"
+_SQL_GET_CHAT = "SELECT * FROM chats WHERE id = ?"
+_SQL_LIST_CHATS = "SELECT * FROM chats ORDER BY updated_at DESC LIMIT ?"
+_SQL_UPDATE_TITLE = f"UPDATE chats SET title = ?, updated_at = {_NOW_SQL} WHERE id = ?"
+_SQL_UPDATE_SUMMARY = f"UPDATE chats SET summary = ?, updated_at = {_NOW_SQL} WHERE id = ?"
+_SQL_DELETE_CHAT_MESSAGES = "DELETE FROM messages WHERE chat_id = ?"
+_SQL_DELETE_CHAT = "DELETE FROM chats WHERE id = ?"
+_SQL_INSERT_MESSAGE = (
+    "INSERT INTO messages (chat_id, role, content, tool_calls, tool_call_id, token_estimate) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_SQL_FIRST_MESSAGES = (
+    f"SELECT {_MESSAGE_COLUMNS} FROM messages WHERE chat_id = ? ORDER BY id ASC LIMIT ?"
+)
+_SQL_LAST_MESSAGES = (
+    f"SELECT {_MESSAGE_COLUMNS} FROM messages WHERE chat_id = ? ORDER BY id DESC LIMIT ?"
+)
+_SQL_MESSAGES_AFTER = (
+    f"SELECT {_MESSAGE_COLUMNS}, id FROM messages "
+    "WHERE chat_id = ? AND id > ? ORDER BY id LIMIT ?"
+)
+_SQL_MESSAGE_COUNT = "SELECT message_count FROM chats WHERE id = ?"
+_SQL_SEARCH_FTS = """
+    SELECT c.* FROM chats c
+    WHERE c.id IN (
+        SELECT chat_id FROM messages_fts WHERE messages_fts MATCH ?
+    )
+    OR c.title LIKE ? OR c.summary LIKE ?
+    ORDER BY c.updated_at DESC LIMIT ?
+"""
+_SQL_SEARCH_LIKE = """
+    SELECT DISTINCT c.* FROM chats c
+    JOIN messages m ON c.id = m.chat_id
+    WHERE m.content LIKE ? OR c.title LIKE ? OR c.summary LIKE ?
+    ORDER BY c.updated_at DESC LIMIT ?
+"""
+_SQL_COUNT_CHATS = "SELECT COUNT(*) FROM chats"
+_SQL_COUNT_MESSAGES = "SELECT COUNT(*) FROM messages"
+
 
 class ChatStore:
     """
@@ -26,51 +78,185 @@ class ChatStore:
 
     def __init__(self, db_path: Path = None):
         self.db_path = db_path or CHAT_DB_PATH
+        # One long-lived connection per thread (CLI, web, Telegram, VivreCard)
+        self._local = threading.local()
+        self._all_conns: list[sqlite3.Connection] = []  # For close() at exit
+        self._all_conns_lock = threading.Lock()
+        self._has_fts = False  # Set by _init_db when SQLite has FTS5
         self._init_db()
+        atexit.register(self.close)
         logger.info(f"Chat store initialized: {self.db_path}")
 
+    def _get_conn(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening and configuring it once."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: transactions are managed explicitly in _conn()
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False,
+                                   isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")  # Better concurrent access
+            conn.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL, fewer fsyncs
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA mmap_size=268435456")
+            conn.execute("PRAGMA cache_size=-20000")  # ~20MB page cache
+            conn.execute("PRAGMA wal_autocheckpoint=1000")  # Bound WAL growth (pages)
+            self._local.conn = conn
+            with self._all_conns_lock:
+                self._all_conns.append(conn)
+        return conn
+
+    def close(self):
+        """
+        Refresh planner statistics, truncate the WAL, and close every
+        thread's connection. Registered with atexit.
+        """
+        with self._all_conns_lock:
+            conns, self._all_conns = self._all_conns, []
+        for i, conn in enumerate(conns):
+            try:
+                conn.execute("PRAGMA optimize")
+                if i == 0:
+                    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                conn.close()
+            except sqlite3.Error as e:
+                logger.debug(f"Chat store close failed: {e}")
+        self._local = threading.local()
+
     @contextmanager
     def _conn(self):
-        """Context manager for database connections."""
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA journal_mode=WAL")  # Better concurrent access
+        """Context manager wrapping one transaction on the thread's connection."""
+        conn = self._get_conn()
+        if conn.in_transaction:
+            # Nested use joins the outer transaction
+            yield conn
+            return
+        conn.execute("BEGIN")
         try:
             yield conn
-            conn.commit()
+            if conn.in_transaction:
+                conn.execute("COMMIT")
         except Exception:
-            conn.rollback()
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
             raise
-        finally:
-            conn.close()
 
     def _init_db(self):
         """Create tables if they don't exist."""
-        with self._conn() as conn:
+        # executescript() manages its own transaction, so skip the _conn() wrapper
+        conn = self._get_conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS chats (
+                id TEXT PRIMARY KEY,
+                title TEXT DEFAULT 'New Chat',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                summary TEXT DEFAULT '',
+                token_count INTEGER DEFAULT 0,
+                message_count INTEGER DEFAULT 0
+            );
+
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                chat_id TEXT REFERENCES chats(id),
+                role TEXT NOT NULL,
+                content TEXT DEFAULT '',
+                tool_calls TEXT DEFAULT '',
+                tool_call_id TEXT DEFAULT '',
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                token_estimate INTEGER DEFAULT 0
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_messages_chat_id
+            ON messages(chat_id);
+        """)
+        self._migrate(conn)
+        conn.executescript(f"""
+            -- Keep the chat's timestamp and counters in step with its messages.
+            -- Dropped first so older databases pick up the current definition.
+            BEGIN;
+            DROP TRIGGER IF EXISTS trg_messages_insert;
+            CREATE TRIGGER trg_messages_insert
+            AFTER INSERT ON messages
+            BEGIN
+                UPDATE chats
+                SET updated_at = {_NOW_SQL},
+                    token_count = token_count + NEW.token_estimate,
+                    message_count = message_count + 1
+                WHERE id = NEW.chat_id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_messages_delete
+            AFTER DELETE ON messages
+            BEGIN
+                UPDATE chats
+                SET token_count = token_count - OLD.token_estimate,
+                    message_count = message_count - 1
+                WHERE id = OLD.chat_id;
+            END;
+            COMMIT;
+        """)
+        self._has_fts = self._init_fts(conn)
+
+    def _migrate(self, conn: sqlite3.Connection):
+        """Add columns introduced after a database was created."""
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(chats)")}
+        if "message_count" not in columns:
+            with self._conn() as tx:
+                tx.execute("ALTER TABLE chats ADD COLUMN message_count INTEGER DEFAULT 0")
+                tx.execute(
+                    "UPDATE chats SET message_count = "
+                    "(SELECT COUNT(*) FROM messages WHERE messages.chat_id = chats.id)"
+                )
+            logger.info("Migrated chat store: added chats.message_count")
+
+    def _init_fts(self, conn: sqlite3.Connection) -> bool:
+        """
+        Create the FTS5 index over message content (kept in sync by triggers).
+        Backfills it once for databases created before the index existed.
+        Returns False if this SQLite build lacks FTS5.
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'"
+        ).fetchone()
+        try:
             conn.executescript("""
-                CREATE TABLE IF NOT EXISTS chats (
-                    id TEXT PRIMARY KEY,
-                    title TEXT DEFAULT 'New Chat',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    summary TEXT DEFAULT '',
-                    token_count INTEGER DEFAULT 0
+                CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+                    content, chat_id UNINDEXED,
+                    content='messages', content_rowid='id'
                 );
 
-                CREATE TABLE IF NOT EXISTS messages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    chat_id TEXT REFERENCES chats(id),
-                    role TEXT NOT NULL,
-                    content TEXT DEFAULT '',
-                    tool_calls TEXT DEFAULT '',
-                    tool_call_id TEXT DEFAULT '',
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    token_estimate INTEGER DEFAULT 0
-                );
+                CREATE TRIGGER IF NOT EXISTS trg_messages_fts_insert
+                AFTER INSERT ON messages
+                BEGIN
+                    INSERT INTO messages_fts (rowid, content, chat_id)
+                    VALUES (NEW.id, NEW.content, NEW.chat_id);
+                END;
 
-                CREATE INDEX IF NOT EXISTS idx_messages_chat_id
-                ON messages(chat_id);
+                CREATE TRIGGER IF NOT EXISTS trg_messages_fts_delete
+                AFTER DELETE ON messages
+                BEGIN
+                    INSERT INTO messages_fts (messages_fts, rowid, content, chat_id)
+                    VALUES ('delete', OLD.id, OLD.content, OLD.chat_id);
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS trg_messages_fts_update
+                AFTER UPDATE ON messages
+                BEGIN
+                    INSERT INTO messages_fts (messages_fts, rowid, content, chat_id)
+                    VALUES ('delete', OLD.id, OLD.content, OLD.chat_id);
+                    INSERT INTO messages_fts (rowid, content, chat_id)
+                    VALUES (NEW.id, NEW.content, NEW.chat_id);
+                END;
             """)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 unavailable, chat search falls back to LIKE: {e}")
+            return False
+
+        if not exists:
+            conn.execute("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')")
+            logger.info("Built full-text index for existing messages")
+        return True
 
     # ──────────────────────────────────────────────
     # Chat operations
@@ -80,51 +266,37 @@ class ChatStore:
         """Create a new chat and return its ID."""
         chat_id = chat_id or generate_id("chat_")
         with self._conn() as conn:
-            conn.execute(
-                "INSERT INTO chats (id, title) VALUES (?, ?)",
-                (chat_id, title)
-            )
+            conn.execute(_SQL_INSERT_CHAT, (chat_id, title))
         logger.info(f"Created chat: {chat_id} — '{title}'")
         return chat_id
 
     def get_chat(self, chat_id: str) -> dict | None:
         """Get a chat by ID."""
         with self._conn() as conn:
-            row = conn.execute(
-                "SELECT * FROM chats WHERE id = ?", (chat_id,)
-            ).fetchone()
+            row = conn.execute(_SQL_GET_CHAT, (chat_id,)).fetchone()
         return dict(row) if row else None
 
     def list_chats(self, limit: int = 20) -> list[dict]:
         """List recent chats."""
         with self._conn() as conn:
-            rows = conn.execute(
-                "SELECT * FROM chats ORDER BY updated_at DESC LIMIT ?",
-                (limit,)
-            ).fetchall()
+            rows = conn.execute(_SQL_LIST_CHATS, (limit,)).fetchall()
         return [dict(r) for r in rows]
 
     def update_chat_title(self, chat_id: str, title: str):
         """Update chat title."""
         with self._conn() as conn:
-            conn.execute(
-                "UPDATE chats SET title = ?, updated_at = ? WHERE id = ?",
-                (title, datetime.now().isoformat(), chat_id)
-            )
+            conn.execute(_SQL_UPDATE_TITLE, (title, chat_id))
 
     def update_chat_summary(self, chat_id: str, summary: str):
         """Update chat summary (for context retrieval)."""
         with self._conn() as conn:
-            conn.execute(
-                "UPDATE chats SET summary = ?, updated_at = ? WHERE id = ?",
-                (summary, datetime.now().isoformat(), chat_id)
-            )
+            conn.execute(_SQL_UPDATE_SUMMARY, (summary, chat_id))
 
     def delete_chat(self, chat_id: str):
         """Delete a chat and all its messages."""
         with self._conn() as conn:
-            conn.execute("DELETE FROM messages WHERE chat_id = ?", (chat_id,))
-            conn.execute("DELETE FROM chats WHERE id = ?", (chat_id,))
+            conn.execute(_SQL_DELETE_CHAT_MESSAGES, (chat_id,))
+            conn.execute(_SQL_DELETE_CHAT, (chat_id,))
         logger.info(f"Deleted chat: {chat_id}")
 
     # ──────────────────────────────────────────────
@@ -134,72 +306,135 @@ class ChatStore:
     def save_message(self, chat_id: str, role: str, content: str,
                      tool_calls: list = None, tool_call_id: str = ""):
         """Save a message to a chat."""
-        # Auto-create chat if it doesn't exist
-        if not self.get_chat(chat_id):
-            self.create_chat(chat_id)
-
-        tc_json = json.dumps(tool_calls) if tool_calls else ""
+        # Stored as a compact UTF-8 BLOB; rows written as TEXT still load fine
+        tc_json = fast_json.dumps_bytes(tool_calls) if tool_calls else ""
         tokens = estimate_tokens(content)
 
         with self._conn() as conn:
+            # Auto-create chat if it doesn't exist
+            conn.execute(_SQL_ENSURE_CHAT, (chat_id,))
+            # trg_messages_insert updates the chat timestamp and token count
             conn.execute(
-                "INSERT INTO messages (chat_id, role, content, tool_calls, tool_call_id, token_estimate) "
-                "VALUES (?, ?, ?, ?, ?, ?)",
+                _SQL_INSERT_MESSAGE,
                 (chat_id, role, content, tc_json, tool_call_id, tokens)
             )
-            # Update chat timestamp and token count
-            conn.execute(
-                "UPDATE chats SET updated_at = ?, token_count = token_count + ? WHERE id = ?",
-                (datetime.now().isoformat(), tokens, chat_id)
-            )
+
+    def save_messages(self, chat_id: str, messages: list[dict]):
+        """
+        Save several messages to a chat in one transaction (bulk import/replay).
+        Each message is a dict with role/content and optional tool_calls/tool_call_id.
+        """
+        if not messages:
+            return
+
+        rows = []
+        for m in messages:
+            content = m.get("content") or ""
+            tool_calls = m.get("tool_calls")
+            rows.append((
+                chat_id, m["role"], content,
+                fast_json.dumps_bytes(tool_calls) if tool_calls else "",
+                m.get("tool_call_id", ""),
+                estimate_tokens(content),
+            ))
+
+        with self._conn() as conn:
+            conn.execute(_SQL_ENSURE_CHAT, (chat_id,))
+            conn.executemany(_SQL_INSERT_MESSAGE, rows)
+        logger.debug(f"Saved {len(rows)} messages to chat {chat_id}")
+
+    @staticmethod
+    def _row_to_message(row: tuple) -> dict:
+        """Convert a (role, content, tool_calls, tool_call_id, ...) row into a message dict."""
+        role, content, tool_calls, tool_call_id = row[:4]
+        msg = {"role": role, "content": content}
+        if tool_calls:
+            try:
+                msg["tool_calls"] = fast_json.loads(tool_calls)
+            except fast_json.JSONDecodeError:
+                pass
+        if tool_call_id:
+            msg["tool_call_id"] = tool_call_id
+        return msg
+
+    @staticmethod
+    def _tuple_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+        """Cursor returning plain tuples (skips sqlite3.Row for bulk message reads)."""
+        cur = conn.cursor()
+        cur.row_factory = None
+        return cur
 
     def get_messages(self, chat_id: str, limit: int = 100) -> list[dict]:
-        """Get messages for a chat (most recent first if limit applied)."""
+        """Get the first `limit` messages of a chat, oldest first."""
         with self._conn() as conn:
-            rows = conn.execute(
-                "SELECT * FROM messages WHERE chat_id = ? ORDER BY id ASC LIMIT ?",
-                (chat_id, limit)
+            rows = self._tuple_cursor(conn).execute(
+                _SQL_FIRST_MESSAGES, (chat_id, limit)
             ).fetchall()
+        return [self._row_to_message(row) for row in rows]
 
-        messages = []
-        for row in rows:
-            msg = {
-                "role": row["role"],
-                "content": row["content"],
-            }
-            if row["tool_calls"]:
-                try:
-                    msg["tool_calls"] = json.loads(row["tool_calls"])
-                except json.JSONDecodeError:
-                    pass
-            if row["tool_call_id"]:
-                msg["tool_call_id"] = row["tool_call_id"]
-            messages.append(msg)
-        return messages
+    def get_recent_messages(self, chat_id: str, limit: int = 100) -> list[dict]:
+        """Get the last `limit` messages of a chat, oldest first."""
+        with self._conn() as conn:
+            rows = self._tuple_cursor(conn).execute(
+                _SQL_LAST_MESSAGES, (chat_id, limit)
+            ).fetchall()
+        return [self._row_to_message(row) for row in reversed(rows)]
+
+    def iter_messages(self, chat_id: str, batch_size: int = 500):
+        """
+        Yield every message of a chat, oldest first, in keyset-paginated batches.
+
+        Each batch seeks past the last seen id (idx_messages_chat_id covers
+        (chat_id, rowid)), so cost is O(batch_size) per page rather than
+        re-scanning with OFFSET.
+        """
+        last_id = 0
+        while True:
+            with self._conn() as conn:
+                rows = self._tuple_cursor(conn).execute(
+                    _SQL_MESSAGES_AFTER, (chat_id, last_id, batch_size)
+                ).fetchall()
+            for row in rows:
+                yield self._row_to_message(row)
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][4]
 
     def get_message_count(self, chat_id: str) -> int:
-        """Get total message count for a chat."""
+        """Get total message count for a chat (maintained by triggers)."""
         with self._conn() as conn:
-            row = conn.execute(
-                "SELECT COUNT(*) as cnt FROM messages WHERE chat_id = ?",
-                (chat_id,)
-            ).fetchone()
-        return row["cnt"] if row else 0
+            row = conn.execute(_SQL_MESSAGE_COUNT, (chat_id,)).fetchone()
+        return row["message_count"] if row else 0
 
     # ──────────────────────────────────────────────
     # Search & retrieval
     # ──────────────────────────────────────────────
 
     def search_chats(self, query: str, limit: int = 5) -> list[dict]:
-        """Search across all chats by content (simple LIKE search)."""
+        """
+        Search across all chats by content, title, and summary.
+        Message content goes through the FTS5 index when available, matching
+        word prefixes ("deplo" finds "deployment"); otherwise falls back to a
+        LIKE scan.
+        """
+        terms = query.split()
+        if self._has_fts and terms:
+            # Quote each term so user input can't inject query syntax, and
+            # make it a prefix match
+            match = " ".join('"' + t.replace('"', '""') + '"*' for t in terms)
+            try:
+                with self._conn() as conn:
+                    rows = conn.execute(
+                        _SQL_SEARCH_FTS,
+                        (match, f"%{query}%", f"%{query}%", limit)
+                    ).fetchall()
+                return [dict(r) for r in rows]
+            except sqlite3.OperationalError as e:
+                logger.debug(f"FTS search failed, using LIKE: {e}")
+
         with self._conn() as conn:
             rows = conn.execute(
-                """
-                SELECT DISTINCT c.* FROM chats c
-                JOIN messages m ON c.id = m.chat_id
-                WHERE m.content LIKE ? OR c.title LIKE ? OR c.summary LIKE ?
-                ORDER BY c.updated_at DESC LIMIT ?
-                """,
+                _SQL_SEARCH_LIKE,
                 (f"%{query}%", f"%{query}%", f"%{query}%", limit)
             ).fetchall()
         return [dict(r) for r in rows]
@@ -207,8 +442,8 @@ class ChatStore:
     def get_stats(self) -> dict:
         """Return storage statistics."""
         with self._conn() as conn:
-            chat_count = conn.execute("SELECT COUNT(*) FROM chats").fetchone()[0]
-            msg_count = conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+            chat_count = conn.execute(_SQL_COUNT_CHATS).fetchone()[0]
+            msg_count = conn.execute(_SQL_COUNT_MESSAGES).fetchone()[0]
             db_size = self.db_path.stat().st_size if self.db_path.exists() else 0
         return {
             "chats": chat_count,
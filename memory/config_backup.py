@@ -8,12 +8,12 @@ Note: This extends the basic backup functions in config/settings.py
 with history browsing and diff capabilities.
 """
 
-import json
 from datetime import datetime
 from pathlib import Path
 
 from config.settings import CONFIG_BACKUP_DIR, DEFAULTS, save_config_backup, load_config_backup
 from utils.logger import get_logger
+from utils import fast_json
 
 logger = get_logger("memory.config_backup")
 
@@ -26,6 +26,9 @@ class ConfigBackupManager:
 
     def __init__(self):
         self.logger = get_logger("memory.config_backup")
+        # list_backups() result, valid while the backup files' (name, mtime, size) match
+        self._list_cache: list[dict] = []
+        self._list_sig: tuple | None = None
 
     def snapshot(self) -> Path:
         """Take a snapshot of current config."""
@@ -58,12 +61,24 @@ class ConfigBackupManager:
         return config
 
     def list_backups(self) -> list[dict]:
-        """List all available config backups."""
+        """List all available config backups (cached until a backup file changes)."""
         backups = sorted(CONFIG_BACKUP_DIR.glob("config_*.json"), reverse=True)
+        try:
+            sig = []
+            for path in backups:
+                st = path.stat()
+                sig.append((path.name, st.st_mtime_ns, st.st_size))
+            sig = tuple(sig)
+        except OSError:
+            sig = None  # A file vanished mid-listing — don't cache this round
+
+        if sig is not None and sig == self._list_sig:
+            return [dict(entry) for entry in self._list_cache]
+
         result = []
         for i, path in enumerate(backups, 1):
             try:
-                data = json.loads(path.read_text())
+                data = fast_json.loads(path.read_bytes())
                 result.append({
                     "step": i,
                     "file": path.name,
@@ -72,7 +87,10 @@ class ConfigBackupManager:
                 })
             except Exception:
                 result.append({"step": i, "file": path.name, "error": "corrupted"})
-        return result
+
+        self._list_cache = result
+        self._list_sig = sig
+        return [dict(entry) for entry in result]
 
     def diff(self, steps: int = 1) -> dict:
         """
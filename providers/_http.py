@@ -0,0 +1,63 @@
+"""
+MRAgent — Shared HTTP Client
+One keep-alive httpx connection pool shared by every OpenAI-compatible client.
+
+Created: 2026-10-15
+
+Usage:
+    from providers._http import get_shared_httpx, prewarm
+    client = OpenAI(api_key=key, base_url=url, http_client=get_shared_httpx())
+    prewarm(url)  # at provider init, before the first chat()
+"""
+
+import atexit
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import httpx
+
+_shared: "httpx.Client | None" = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_httpx() -> "httpx.Client":
+    """
+    The process-wide httpx client, created on first use.
+
+    Warm sockets are reused across chat, STT and per-key clients instead of
+    paying TCP+TLS on every cold request. Per-request timeouts passed to
+    OpenAI(...) still take precedence over the default here.
+    """
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                import httpx  # Deferred: installed with the openai SDK, costly to import
+                client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_keepalive_connections=20,
+                        max_connections=100,
+                        keepalive_expiry=30.0,
+                    ),
+                    timeout=60.0,
+                )
+                atexit.register(client.close)
+                _shared = client
+    return _shared
+
+
+def prewarm(url: str):
+    """
+    Open a pooled connection to url's host in the background, so the first
+    real request finds a live TLS session instead of paying the handshake.
+    Best-effort: any failure is ignored and the next request connects normally.
+    The httpx import and client construction also happen on that thread.
+    """
+    def _warm():
+        try:
+            get_shared_httpx().head(url, timeout=5.0)
+        except Exception:
+            pass
+
+    threading.Thread(target=_warm, name="http-prewarm", daemon=True).start()
@@ -0,0 +1,64 @@
+"""
+MRAgent — LLM Response Cache
+In-process LRU for deterministic (temperature 0, non-streaming, tool-free) chats.
+
+Created: 2026-10-15
+
+Usage:
+    from providers._llm_cache import RESPONSE_CACHE, make_key
+    key = make_key("nvidia_llm", model, messages, max_tokens)
+    result = RESPONSE_CACHE.get(key)
+"""
+
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+DEFAULT_CAPACITY = 512
+
+
+def is_cacheable(stream: bool, tools: list | None, temperature: float) -> bool:
+    """Only greedy, non-streaming, tool-free requests give repeatable answers."""
+    return not stream and not tools and temperature == 0
+
+
+def make_key(provider: str, model: str, messages: list[dict], max_tokens: int) -> str:
+    """Content hash of everything that determines the response."""
+    payload = json.dumps(
+        {"provider": provider, "model": model, "messages": messages, "max_tokens": max_tokens},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Thread-safe LRU of response dicts; returns copies so callers can mutate them."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._data: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            result = self._data.get(key)
+            if result is None:
+                return None
+            self._data.move_to_end(key)
+        return copy.deepcopy(result)
+
+    def put(self, key: str, result: dict):
+        with self._lock:
+            self._data[key] = copy.deepcopy(result)
+            self._data.move_to_end(key)
+            while len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+RESPONSE_CACHE = ResponseCache()
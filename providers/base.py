@@ -6,6 +6,9 @@ Created: 2026-02-15
 """
 
 import time
+import random
+import asyncio
+import threading
 from abc import ABC, abstractmethod
 from typing import Generator
 
@@ -15,31 +18,43 @@ logger = get_logger("providers.base")
 
 
 class RateLimiter:
-    """Simple rate limiter that tracks requests per minute."""
+    """
+    Token-bucket rate limiter.
+
+    The bucket holds up to max_rpm tokens and refills at max_rpm/60 per second,
+    so a burst of up to max_rpm requests goes through at once and only
+    sustained excess is throttled. Thread-safe: each caller reserves its token
+    under the lock and sleeps outside it.
+    """
 
     def __init__(self, max_rpm: int = 35):
         self.max_rpm = max_rpm
-        self._timestamps: list[float] = []
-
-    def wait_if_needed(self):
-        """Block if we've hit the rate limit. Clears old timestamps."""
-        now = time.time()
-        # Remove timestamps older than 60 seconds
-        self._timestamps = [t for t in self._timestamps if now - t < 60]
-
-        if len(self._timestamps) >= self.max_rpm:
-            sleep_time = 60 - (now - self._timestamps[0]) + 0.1
-            if sleep_time > 0:
-                logger.warning(f"Rate limit reached ({self.max_rpm} RPM). Sleeping {sleep_time:.1f}s...")
-                time.sleep(sleep_time)
-
-        self._timestamps.append(time.time())
+        self._rate = max_rpm / 60.0  # tokens per second
+        self._tokens = float(max_rpm)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.max_rpm, self._tokens + (now - self._last_refill) * self._rate)
+        self._last_refill = now
+
+    def wait_if_needed(self, cost: float = 1.0):
+        """Take `cost` tokens, blocking until the bucket has refilled enough."""
+        with self._lock:
+            self._refill(time.monotonic())
+            # Reserve now (may go negative) so concurrent callers queue fairly
+            self._tokens -= cost
+            sleep_time = -self._tokens / self._rate if self._tokens < 0 else 0.0
+
+        if sleep_time > 0:
+            logger.warning("Rate limit reached (%s RPM). Sleeping %.1fs...", self.max_rpm, sleep_time)
+            time.sleep(sleep_time)
 
     @property
     def requests_remaining(self) -> int:
-        now = time.time()
-        recent = [t for t in self._timestamps if now - t < 60]
-        return max(0, self.max_rpm - len(recent))
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0, int(self._tokens))
 
 
 class BaseProvider(ABC):
@@ -78,30 +93,55 @@ class BaseProvider(ABC):
                     tokens_used: int = 0):
         """Log and track an API call."""
         self._call_count += 1
-        if status != "ok":
+        if status not in ("ok", "cache_hit"):
             self._error_count += 1
         log_api_call(self.logger, self.name, endpoint, model, duration_ms, status, tokens_used)
 
-    def _retry_call(self, func, max_retries: int = 3, base_delay: float = 1.0):
-        """Execute a function with exponential backoff retry."""
+    def _retry_call(self, func, max_retries: int = 3, base_delay: float = 1.0,
+                    rate_limiter: RateLimiter = None):
+        """
+        Execute a function with exponential backoff retry.
+        rate_limiter overrides the provider-wide bucket (e.g. one per API key).
+        """
+        limiter = rate_limiter or self.rate_limiter
         last_exception = None
         for attempt in range(max_retries):
             try:
-                self.rate_limiter.wait_if_needed()
+                limiter.wait_if_needed()
                 return func()
             except Exception as e:
                 last_exception = e
                 # Fail fast on unrecoverable authentication or routing errors
                 if hasattr(e, "status_code") and getattr(e, "status_code") in (401, 403, 404):
-                    self.logger.error(f"Unrecoverable API error {getattr(e, 'status_code')}: {e}. Skipping retries.")
+                    self.logger.error("Unrecoverable API error %s: %s. Skipping retries.", getattr(e, 'status_code'), e)
                     raise e
                     
-                self.logger.warning(f"Attempt {attempt + 1}/{max_retries} failed: {e}")
+                self.logger.warning("Attempt %s/%s failed: %s", attempt + 1, max_retries, e)
                 if attempt < max_retries - 1:
-                    delay = min(base_delay * (2 ** attempt), 30.0)
-                    time.sleep(delay)
+                    time.sleep(self._retry_delay(e, attempt, base_delay))
         raise last_exception
 
+    @staticmethod
+    def _retry_delay(e: Exception, attempt: int, base_delay: float) -> float:
+        """
+        Seconds to wait before the next attempt.
+
+        A 429 with a numeric Retry-After is honoured (plus a little jitter so
+        throttled callers don't retry in lockstep). Everything else uses
+        exponential backoff with full jitter, capped at 30s.
+        """
+        response = getattr(e, "response", None)
+        status = getattr(e, "status_code", None) or getattr(response, "status_code", None)
+        if status == 429:
+            headers = getattr(response, "headers", None) or {}
+            try:
+                retry_after = float(headers.get("retry-after", ""))
+            except (TypeError, ValueError):
+                retry_after = None  # Missing, or an HTTP-date
+            if retry_after is not None:
+                return min(max(retry_after, base_delay), 60.0) + random.uniform(0, base_delay)
+        return random.uniform(0, min(base_delay * (2 ** attempt), 30.0))
+
     @property
     def stats(self) -> dict:
         """Return provider usage statistics."""
@@ -116,6 +156,17 @@ class BaseProvider(ABC):
 class LLMProvider(BaseProvider):
     """Base class for LLM (chat) providers."""
 
+    @staticmethod
+    def _cached_prompt_tokens(usage) -> int:
+        """Extract prompt-cache hits from a usage object (OpenAI or DeepSeek shape)."""
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) if details else None
+        if cached is None:
+            cached = getattr(usage, "prompt_cache_hit_tokens", None)
+        if cached is None:
+            cached = getattr(usage, "cache_read_input_tokens", 0)
+        return cached or 0
+
     @abstractmethod
     def chat(self, messages: list[dict], model: str = "",
              stream: bool = True, tools: list[dict] = None,
@@ -133,10 +184,41 @@ class LLMProvider(BaseProvider):
 
         Returns:
             If stream=False: dict with {"content": str, "tool_calls": list, "usage": dict}
-            If stream=True: Generator yielding {"delta": str} chunks
+            If stream=True: Generator yielding {"delta": str} chunks. The same
+                content dict may be reused between yields — copy it to keep it.
         """
         pass
 
+    async def achat(self, messages: list[dict], model: str = "",
+                    tools: list[dict] = None, temperature: float = 0.7,
+                    max_tokens: int = 4096) -> dict:
+        """
+        Non-streaming chat() for async callers.
+        Runs the blocking request in a worker thread so the event loop keeps
+        running; the provider's pooled HTTP clients are reused as usual.
+        """
+        return await asyncio.to_thread(
+            self.chat, messages, model=model, stream=False, tools=tools,
+            temperature=temperature, max_tokens=max_tokens,
+        )
+
+    async def achat_batch(self, messages_list: list[list[dict]], model: str = "",
+                          max_concurrency: int = 16, **kwargs) -> list[dict]:
+        """
+        Run many independent non-streaming chats concurrently.
+
+        At most max_concurrency requests are in flight at once; each goes
+        through achat(), so the keep-alive pool, per-key rate limiting and the
+        response cache all apply. Results are returned in input order.
+        """
+        sem = asyncio.Semaphore(max_concurrency)
+
+        async def _one(messages: list[dict]) -> dict:
+            async with sem:
+                return await self.achat(messages, model=model, **kwargs)
+
+        return await asyncio.gather(*map(_one, messages_list))
+
 
 class ImageProvider(BaseProvider):
     """Base class for image generation providers."""
@@ -48,7 +48,7 @@ class BraveSearchProvider(SearchProvider):
         # LLMs sometimes pass count as a string
         count = int(count)
 
-        self.logger.info(f"Search: '{query}' (count={count})")
+        self.logger.info("Search: '%s' (count=%s)", query, count)
         start_time = time.time()
 
         def _make_request():
@@ -85,7 +85,7 @@ class BraveSearchProvider(SearchProvider):
                 })
 
             self._track_call("web/search", "", duration_ms, status="ok")
-            self.logger.info(f"Search returned {len(results)} results ({duration_ms:.0f}ms)")
+            self.logger.info("Search returned %s results (%.0fms)", len(results), duration_ms)
 
             return results
 
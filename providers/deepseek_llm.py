@@ -9,13 +9,17 @@ Created: 2026-02-27
 
 import os
 import time
-from typing import Generator
+import itertools
+from typing import Generator, TYPE_CHECKING
 
-from openai import OpenAI
-
-from providers.base import LLMProvider
+from providers._http import get_shared_httpx, prewarm
+from providers._llm_cache import RESPONSE_CACHE, is_cacheable, make_key
+from providers.base import LLMProvider, RateLimiter
 from utils.logger import get_logger
 
+if TYPE_CHECKING:
+    from openai import OpenAI
+
 logger = get_logger("providers.deepseek_llm")
 
 DEEPSEEK_BASE_URL = "https://api.deepseek.com/v1"
@@ -37,6 +41,11 @@ DEEPSEEK_MODELS = {
     },
 }
 
+# Model name → tool support, resolved once instead of per chat() call
+_SUPPORTS_TOOLS = {
+    name: info.get("supports_tools", True) for name, info in DEEPSEEK_MODELS.items()
+}
+
 
 class DeepSeekLLMProvider(LLMProvider):
     """
@@ -46,31 +55,45 @@ class DeepSeekLLMProvider(LLMProvider):
         - deepseek-chat   (DeepSeek V3 — general purpose, tools supported)
         - deepseek-reasoner (DeepSeek R1 — advanced reasoning)
 
-    API key is read from DEEPSEEK_API_KEY environment variable.
+    API key is read from DEEPSEEK_API_KEY environment variable. Set
+    DEEPSEEK_API_KEYS (comma-separated) to round-robin over several keys,
+    each with its own client and rate-limit bucket.
     """
 
     def __init__(self, rate_limit_rpm: int = 30):
         super().__init__(name="deepseek_llm", rate_limit_rpm=rate_limit_rpm)
-        self._api_key = os.getenv("DEEPSEEK_API_KEY", "")
-        self._client: OpenAI | None = None
+        keys = os.getenv("DEEPSEEK_API_KEYS", "") or os.getenv("DEEPSEEK_API_KEY", "")
+        self._keys = [k.strip() for k in keys.split(",") if k.strip()]
+        self._api_key = self._keys[0] if self._keys else ""
+        # One lazily-built client and one bucket per key; all share the httpx pool
+        self._clients: list["OpenAI | None"] = [None] * len(self._keys)
+        self._limiters = [self.rate_limiter] + [
+            RateLimiter(max_rpm=rate_limit_rpm) for _ in self._keys[1:]
+        ]
+        self._rr = itertools.count()
         if not self._api_key:
             self.logger.warning("DEEPSEEK_API_KEY not set — DeepSeek provider unavailable")
         else:
-            self.logger.info("DeepSeek LLM provider initialized")
+            prewarm(DEEPSEEK_BASE_URL)
+            self.logger.info("DeepSeek LLM provider initialized (%s key(s))", len(self._keys))
 
     @property
     def available(self) -> bool:
         return bool(self._api_key)
 
-    def _get_client(self) -> OpenAI:
-        """Lazy-initialise OpenAI client pointing at DeepSeek."""
-        if self._client is None:
-            self._client = OpenAI(
-                api_key=self._api_key,
+    def _pick_client(self) -> tuple["OpenAI", RateLimiter]:
+        """Round-robin to the next key's client (created lazily) and its rate limiter."""
+        i = next(self._rr) % len(self._keys)
+        client = self._clients[i]
+        if client is None:
+            from openai import OpenAI  # Deferred: pulls in pydantic, only needed on first chat
+            client = self._clients[i] = OpenAI(
+                api_key=self._keys[i],
                 base_url=DEEPSEEK_BASE_URL,
                 timeout=60.0,
+                http_client=get_shared_httpx(),
             )
-        return self._client
+        return client, self._limiters[i]
 
     def chat(
         self,
@@ -99,40 +122,55 @@ class DeepSeekLLMProvider(LLMProvider):
         if not self.available:
             raise RuntimeError("DeepSeek API key not configured. Set DEEPSEEK_API_KEY in .env")
 
-        # Normalise model name
-        if model not in DEEPSEEK_MODELS:
-            self.logger.warning(f"Unknown DeepSeek model '{model}', defaulting to deepseek-chat")
+        # Normalise model name (one lookup resolves both the name and tool support)
+        supports_tools = _SUPPORTS_TOOLS.get(model)
+        if supports_tools is None:
+            self.logger.warning("Unknown DeepSeek model '%s', defaulting to deepseek-chat", model)
             model = "deepseek-chat"
+            supports_tools = _SUPPORTS_TOOLS[model]
+
+        # Deterministic requests are answered from the in-process cache
+        cache_key = None
+        if is_cacheable(stream, tools, temperature):
+            cache_key = make_key(self.name, model, messages, max_tokens)
+            cached = RESPONSE_CACHE.get(cache_key)
+            if cached is not None:
+                self._track_call("chat/completions", model, 0, status="cache_hit", tokens_used=0)
+                return cached
 
-        model_info = DEEPSEEK_MODELS[model]
-        client = self._get_client()
+        client, limiter = self._pick_client()
 
-        self.logger.debug(f"DeepSeek chat request: model={model}, stream={stream}")
+        self.logger.debug("DeepSeek chat request: model=%s, stream=%s", model, stream)
         start_time = time.time()
 
+        # Built once; retries resend the same request
+        kwargs = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": stream,
+        }
+        # R1 (reasoner) does not support tool calling
+        if tools and supports_tools:
+            kwargs["tools"] = tools
+            kwargs["tool_choice"] = "auto"
+        elif tools:
+            self.logger.debug("Skipping tools for %s — not supported", model)
+
         def _make_request():
-            kwargs = {
-                "model": model,
-                "messages": messages,
-                "temperature": temperature,
-                "max_tokens": max_tokens,
-                "stream": stream,
-            }
-            # R1 (reasoner) does not support tool calling
-            if tools and model_info.get("supports_tools", True):
-                kwargs["tools"] = tools
-                kwargs["tool_choice"] = "auto"
-            elif tools:
-                self.logger.debug(f"Skipping tools for {model} — not supported")
             return client.chat.completions.create(**kwargs)
 
-        response = self._retry_call(_make_request)
+        response = self._retry_call(_make_request, rate_limiter=limiter)
         duration_ms = (time.time() - start_time) * 1000
 
         if stream:
             return self._handle_stream(response, model, duration_ms)
-        else:
-            return self._handle_response(response, model, duration_ms)
+
+        result = self._handle_response(response, model, duration_ms)
+        if cache_key:
+            RESPONSE_CACHE.put(cache_key, result)
+        return result
 
     # ──────────────────────────────────────────────
     # Response handlers (mirrored from nvidia_llm)
@@ -168,6 +206,7 @@ class DeepSeekLLMProvider(LLMProvider):
                 "prompt_tokens": response.usage.prompt_tokens,
                 "completion_tokens": response.usage.completion_tokens,
                 "total_tokens": response.usage.total_tokens,
+                "cached_tokens": self._cached_prompt_tokens(response.usage),
             }
 
         tokens = result["usage"].get("total_tokens", 0)
@@ -176,9 +215,15 @@ class DeepSeekLLMProvider(LLMProvider):
         return result
 
     def _handle_stream(self, response, model_id: str, start_duration_ms: float) -> Generator:
-        """Process a streaming response, yielding chunks."""
-        full_content = ""
-        tool_calls_buffer = {}
+        """
+        Process a streaming response, yielding chunks.
+
+        Content chunks reuse one dict whose "delta" is overwritten per token;
+        consumers must read it before advancing and must not keep a reference.
+        """
+        parts: list[str] = []  # Joined once at finish — += is quadratic on long streams
+        tool_calls_buffer: list[dict | None] = []  # Indexed by tc.index (small ints)
+        content_frame = {"delta": "", "type": "content"}
 
         try:
             for chunk in response:
@@ -188,41 +233,45 @@ class DeepSeekLLMProvider(LLMProvider):
                 delta = chunk.choices[0].delta
 
                 if delta.content:
-                    full_content += delta.content
-                    yield {"delta": delta.content, "type": "content"}
+                    parts.append(delta.content)
+                    content_frame["delta"] = delta.content
+                    yield content_frame
 
                 if delta.tool_calls:
                     for tc in delta.tool_calls:
                         idx = tc.index
-                        if idx not in tool_calls_buffer:
-                            tool_calls_buffer[idx] = {
+                        if idx >= len(tool_calls_buffer):
+                            tool_calls_buffer.extend([None] * (idx + 1 - len(tool_calls_buffer)))
+                        entry = tool_calls_buffer[idx]
+                        if entry is None:
+                            entry = tool_calls_buffer[idx] = {
                                 "id": tc.id or "",
                                 "function": {"name": "", "arguments": ""},
                             }
                         if tc.id:
-                            tool_calls_buffer[idx]["id"] = tc.id
+                            entry["id"] = tc.id
                         if tc.function:
                             if tc.function.name:
-                                tool_calls_buffer[idx]["function"]["name"] += tc.function.name
+                                entry["function"]["name"] += tc.function.name
                             if tc.function.arguments:
-                                tool_calls_buffer[idx]["function"]["arguments"] += tc.function.arguments
+                                entry["function"]["arguments"] += tc.function.arguments
 
                 if chunk.choices[0].finish_reason:
                     if tool_calls_buffer:
                         yield {
-                            "tool_calls": list(tool_calls_buffer.values()),
+                            "tool_calls": [tc for tc in tool_calls_buffer if tc is not None],
                             "type": "tool_calls",
                         }
                     yield {
                         "finish_reason": chunk.choices[0].finish_reason,
                         "type": "finish",
-                        "full_content": full_content,
+                        "full_content": "".join(parts),
                     }
 
         finally:
             duration_ms = (time.time() * 1000) - start_duration_ms
             self._track_call("chat/completions", model_id, duration_ms,
-                             status="ok", tokens_used=len(full_content) // 4)
+                             status="ok", tokens_used=sum(map(len, parts)) // 4)
 
     def list_models(self) -> list[dict]:
         """Return available DeepSeek models."""
@@ -15,7 +15,7 @@ from io import BytesIO
 from providers.base import ImageProvider
 from config.settings import IMAGES_DIR
 from utils.logger import get_logger
-from utils.helpers import get_timestamp_short
+from utils.helpers import get_unique_timestamp
 
 logger = get_logger("providers.google_image")
 
@@ -79,7 +79,7 @@ class GoogleImageProvider(ImageProvider):
             if hint:
                 enhanced_prompt = f"{prompt}, {hint}"
 
-        self.logger.info(f"Generating image via Google: model={target_model}, prompt='{prompt[:60]}...'")
+        self.logger.info("Generating image via Google: model=%s, prompt='%s...'", target_model, prompt[:60])
         start_time = time.time()
 
         try:
@@ -104,14 +104,14 @@ class GoogleImageProvider(ImageProvider):
             b64_image = base64.b64encode(image_bytes).decode("utf-8")
 
             # Save to disk
-            timestamp = get_timestamp_short()
+            timestamp = get_unique_timestamp()
             filename = f"img_{timestamp}_google_gemini.png"
             filepath = IMAGES_DIR / filename
             filepath.write_bytes(image_bytes)
 
             duration_ms = (time.time() - start_time) * 1000
             self._track_call("image/generate", target_model, duration_ms, status="ok")
-            self.logger.info(f"Image saved: {filepath} ({duration_ms:.0f}ms)")
+            self.logger.info("Image saved: %s (%.0fms)", filepath, duration_ms)
 
             return {
                 "base64": b64_image,
@@ -126,7 +126,7 @@ class GoogleImageProvider(ImageProvider):
             error_str = str(e).lower()
             # Detect quota exhaustion
             if any(kw in error_str for kw in ["quota", "429", "rate limit", "resource exhausted"]):
-                self.logger.warning(f"Google image quota exhausted: {e}")
+                self.logger.warning("Google image quota exhausted: %s", e)
                 raise QuotaExhaustedError(f"Google image API quota exhausted: {e}") from e
             raise
 
@@ -48,7 +48,7 @@ class LangSearchProvider(SearchProvider):
         # LLMs sometimes pass count as a string
         count = int(count)
 
-        self.logger.info(f"Search: '{query}' (count={count})")
+        self.logger.info("Search: '%s' (count=%s)", query, count)
         start_time = time.time()
 
         def _make_request():
@@ -85,7 +85,7 @@ class LangSearchProvider(SearchProvider):
                 })
 
             self._track_call("web/search", "", duration_ms, status="ok")
-            self.logger.info(f"Search returned {len(results)} results ({duration_ms:.0f}ms)")
+            self.logger.info("Search returned %s results (%.0fms)", len(results), duration_ms)
 
             return results
 
@@ -104,11 +104,11 @@ class LangSearchProvider(SearchProvider):
         try:
             results = self.search(query, count)
         except Exception as e:
-            self.logger.error(f"Search failed: {e}")
+            self.logger.error("Search failed: %s", e)
             return f"❌ Search failed: {e}"
 
         if not results:
-            self.logger.info(f"No results found for '{query}'")
+            self.logger.info("No results found for '%s'", query)
             return f"No results found for: {query}"
 
         lines = [f"## LangSearch Results for: {query}\n"]
@@ -131,7 +131,7 @@ class LangSearchProvider(SearchProvider):
             lines.append(f"[{i}] [{r.get('title', 'Untitled')}]({r.get('url', '#')})")
 
         formatted = "\n".join(lines)
-        self.logger.debug(f"Formatted output ({len(formatted)} chars):\n{formatted[:200]}...")
+        self.logger.debug("Formatted output (%s chars):\n%s...", len(formatted), formatted[:200])
         return formatted
 
     @property
@@ -7,14 +7,19 @@ Updated: 2026-02-16 — Fixed endpoints and payload format
 """
 
 import time
+import atexit
 import base64
+import threading
 import requests
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 from providers.base import ImageProvider
 from config.settings import NVIDIA_KEYS, IMAGES_DIR
 from utils.logger import get_logger
-from utils.helpers import get_timestamp_short
+from utils.helpers import get_unique_timestamp
+from utils import fast_json
 
 logger = get_logger("providers.nvidia_image")
 
@@ -33,6 +38,74 @@ IMAGE_MODELS = {
     },
 }
 
+# Fixed fields per payload format; per-call fields are merged on top
+_PAYLOAD_TEMPLATES = {
+    "flux": {"mode": "base"},
+    "sd3": {},
+}
+
+# Aspect ratio → FLUX width/height
+_ASPECT_DIMENSIONS = {
+    "1:1":  (1024, 1024),
+    "4:3":  (1024, 768),
+    "3:4":  (768, 1024),
+    "16:9": (1024, 576),
+    "9:16": (576, 1024),
+}
+
+# Request headers per API key value (keys can be set at runtime by the setup wizard)
+_HEADERS_BY_KEY: dict[str, dict] = {}
+
+
+def _headers_for(api_key: str) -> dict:
+    headers = _HEADERS_BY_KEY.get(api_key)
+    if headers is None:
+        headers = _HEADERS_BY_KEY[api_key] = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        }
+    return headers
+
+
+# Host all image endpoints share (used to pre-warm the pool)
+IMAGE_HOST = "https://ai.api.nvidia.com"
+
+# One keep-alive pool for all image requests — repeated generations skip the
+# TCP+TLS handshake. Retries are handled by _retry_call, not urllib3.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
+
+# Base64 characters decoded per write (multiple of 4 → ~48 KiB of PNG per chunk)
+_B64_CHUNK = 64 * 1024
+
+
+def _decode_and_save(b64_image: str, filepath: Path):
+    """
+    Decode base64 image data to filepath in fixed-size windows, so the full
+    decoded image is never held in memory alongside the encoded string.
+    """
+    if len(b64_image) % 4 or "\n" in b64_image:
+        # Wrapped or unpadded payloads don't split on 4-char boundaries
+        filepath.write_bytes(base64.b64decode(b64_image))
+        return
+    with open(filepath, "wb") as f:
+        for i in range(0, len(b64_image), _B64_CHUNK):
+            f.write(base64.b64decode(b64_image[i:i + _B64_CHUNK]))
+
+
+# Decode + write runs here when generate_image(sync=False), overlapping disk I/O
+# with whatever the caller does next (e.g. the next generation's network wait)
+_IO_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image-io")
+
+
+def wait_image(result: dict) -> Path:
+    """Block until an image from generate_image(sync=False) is on disk; returns its path."""
+    future = result.get("filepath_future")
+    if future is not None:
+        future.result()
+    return result["filepath"]
+
 
 class NvidiaImageProvider(ImageProvider):
     """
@@ -43,13 +116,28 @@ class NvidiaImageProvider(ImageProvider):
 
     def __init__(self, rate_limit_rpm: int = 35):
         super().__init__(name="nvidia_image", rate_limit_rpm=rate_limit_rpm)
+        atexit.register(self.close)
+        threading.Thread(target=self._prewarm, name="image-prewarm", daemon=True).start()
         self.logger.info("NVIDIA Image provider initialized")
 
+    @staticmethod
+    def _prewarm():
+        """Open a pooled TLS connection to the image host before the first generation."""
+        try:
+            _SESSION.head(IMAGE_HOST, timeout=5)
+        except requests.RequestException:
+            pass
+
+    def close(self):
+        """Release idle pooled connections."""
+        _SESSION.close()
+
     def generate_image(self, prompt: str, model: str = "flux-dev",
                        width: int = None, height: int = None,
                        aspect_ratio: str = "1:1",
                        steps: int = 50, cfg_scale: float = 5.0,
-                       seed: int = 0, negative_prompt: str = "") -> dict:
+                       seed: int = 0, negative_prompt: str = "",
+                       sync: bool = True) -> dict:
         """
         Generate an image from a text prompt.
 
@@ -62,9 +150,12 @@ class NvidiaImageProvider(ImageProvider):
             cfg_scale: How closely to follow the prompt (1-20)
             seed: Random seed (0 = random)
             negative_prompt: What to avoid (sd-3-medium only)
+            sync: Write the file before returning. With sync=False the write
+                  runs in the background; use wait_image(result) before reading it.
 
         Returns:
             {"base64": str, "seed": int, "filepath": Path, "model": str}
+            plus "filepath_future" when sync=False
         """
         if model not in IMAGE_MODELS:
             raise ValueError(f"Unknown image model: {model}. Available: {list(IMAGE_MODELS.keys())}")
@@ -77,54 +168,38 @@ class NvidiaImageProvider(ImageProvider):
         if not api_key:
             raise ValueError(f"API key not set for {model} (env: NVIDIA_{key_name.upper()})")
 
-        self.logger.info(f"Generating image: model={model}, prompt='{prompt[:60]}...'")
+        self.logger.info("Generating image: model=%s, prompt='%s...'", model, prompt[:60])
         start_time = time.time()
 
+        # Build payload and headers once — retries resend the same request
+        payload_format = model_info["payload_format"]
+        payload = _PAYLOAD_TEMPLATES[payload_format] | {
+            "prompt": prompt,
+            "cfg_scale": cfg_scale,
+            "steps": steps,
+            "seed": seed,
+        }
+        if payload_format == "flux":
+            default_w, default_h = _ASPECT_DIMENSIONS.get(aspect_ratio, (1024, 1024))
+            payload["width"] = width or default_w
+            payload["height"] = height or default_h
+        else:  # sd3 format
+            payload["aspect_ratio"] = aspect_ratio
+            payload["negative_prompt"] = negative_prompt or ""
+        headers = _headers_for(api_key)
+        body = fast_json.dumps_bytes(payload)  # orjson when installed; Content-Type set above
+
         def _make_request():
-            # Convert aspect_ratio to actual dimensions for FLUX
-            aspect_dimensions = {
-                "1:1":  (1024, 1024),
-                "4:3":  (1024, 768),
-                "3:4":  (768, 1024),
-                "16:9": (1024, 576),
-                "9:16": (576, 1024),
-            }
-            img_w = width or aspect_dimensions.get(aspect_ratio, (1024, 1024))[0]
-            img_h = height or aspect_dimensions.get(aspect_ratio, (1024, 1024))[1]
-
-            # Build payload based on model format
-            if model_info["payload_format"] == "flux":
-                payload = {
-                    "prompt": prompt,
-                    "mode": "base",
-                    "cfg_scale": cfg_scale,
-                    "width": img_w,
-                    "height": img_h,
-                    "steps": steps,
-                    "seed": seed,
-                }
-            else:  # sd3 format
-                payload = {
-                    "prompt": prompt,
-                    "cfg_scale": cfg_scale,
-                    "aspect_ratio": aspect_ratio,
-                    "steps": steps,
-                    "seed": seed,
-                    "negative_prompt": negative_prompt or "",
-                }
-
-            resp = requests.post(
+            resp = _SESSION.post(
                 endpoint,
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json",
-                    "Accept": "application/json",
-                },
-                json=payload,
+                headers=headers,
+                data=body,
                 timeout=120,  # Image gen can be slow
             )
             resp.raise_for_status()
-            return resp.json()
+            # Parse the raw bytes directly (orjson when available) — skips the
+            # intermediate decoded-text copy of a multi-MB payload
+            return fast_json.loads(resp.content)
 
         try:
             data = self._retry_call(_make_request)
@@ -144,21 +219,26 @@ class NvidiaImageProvider(ImageProvider):
                 result_seed = artifacts[0].get("seed", seed)
 
             # Save image to disk
-            timestamp = get_timestamp_short()
+            timestamp = get_unique_timestamp()
             filename = f"img_{timestamp}_{model.replace('.', '_').replace('-', '_')}.png"
             filepath = IMAGES_DIR / filename
-            filepath.write_bytes(base64.b64decode(b64_image))
+            future = _IO_EXECUTOR.submit(_decode_and_save, b64_image, filepath)
+            if sync:
+                future.result()
 
             self._track_call("image/generate", model, duration_ms, status="ok")
-            self.logger.info(f"Image saved: {filepath} ({duration_ms:.0f}ms)")
+            self.logger.info("Image saved: %s (%.0fms)", filepath, duration_ms)
 
-            return {
+            result = {
                 "base64": b64_image,
                 "seed": result_seed,
                 "filepath": filepath,
                 "model": model,
                 "prompt": prompt,
             }
+            if not sync:
+                result["filepath_future"] = future
+            return result
 
         except Exception as e:
             duration_ms = (time.time() - start_time) * 1000
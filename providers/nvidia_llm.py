@@ -7,14 +7,17 @@ Created: 2026-02-15
 """
 
 import time
-from typing import Generator
-
-from openai import OpenAI
+from typing import Generator, TYPE_CHECKING
 
+from providers._http import get_shared_httpx, prewarm
+from providers._llm_cache import RESPONSE_CACHE, is_cacheable, make_key
 from providers.base import LLMProvider
 from config.settings import NVIDIA_BASE_URL, NVIDIA_KEYS, MODEL_REGISTRY, get_api_key
 from utils.logger import get_logger
 
+if TYPE_CHECKING:
+    from openai import OpenAI
+
 logger = get_logger("providers.nvidia_llm")
 
 
@@ -29,20 +32,23 @@ class NvidiaLLMProvider(LLMProvider):
     def __init__(self, rate_limit_rpm: int = 35):
         super().__init__(name="nvidia_llm", rate_limit_rpm=rate_limit_rpm)
         # Create one client per API key (models may use different keys)
-        self._clients: dict[str, OpenAI] = {}
+        self._clients: dict[str, "OpenAI"] = {}
+        prewarm(NVIDIA_BASE_URL)
         self.logger.info("NVIDIA LLM provider initialized")
 
-    def _get_client(self, model_name: str) -> OpenAI:
+    def _get_client(self, model_name: str) -> "OpenAI":
         """Get or create an OpenAI client for the given model."""
         api_key = get_api_key(model_name)
 
         if api_key not in self._clients:
+            from openai import OpenAI  # Deferred: pulls in pydantic, only needed on first chat
             self._clients[api_key] = OpenAI(
                 base_url=NVIDIA_BASE_URL,
                 api_key=api_key,
                 timeout=60.0,  # 60s timeout — prevents hanging on cold/queued models
+                http_client=get_shared_httpx(),  # One keep-alive pool across all keys
             )
-            self.logger.debug(f"Created OpenAI client for model: {model_name}")
+            self.logger.debug("Created OpenAI client for model: %s", model_name)
 
         return self._clients[api_key]
 
@@ -62,7 +68,7 @@ class NvidiaLLMProvider(LLMProvider):
                 return name, model
 
         # Fallback: assume it's a valid NIM model ID
-        self.logger.warning(f"Unknown model '{model}', passing through as-is")
+        self.logger.warning("Unknown model '%s', passing through as-is", model)
         return model, model
 
     def chat(self, messages: list[dict], model: str = "kimi-k2.5",
@@ -83,6 +89,15 @@ class NvidiaLLMProvider(LLMProvider):
             If stream=False: {"content": str, "tool_calls": list, "usage": dict}
             If stream=True: Generator yielding {"delta": str} or {"tool_calls": list}
         """
+        # Deterministic requests are answered from the in-process cache
+        cache_key = None
+        if is_cacheable(stream, tools, temperature):
+            cache_key = make_key(self.name, model, messages, max_tokens)
+            cached = RESPONSE_CACHE.get(cache_key)
+            if cached is not None:
+                self._track_call("chat/completions", model, 0, status="cache_hit", tokens_used=0)
+                return cached
+
         # Define the parameter step-down chain
         fallback_chain = [
             "qwen3-235b",
@@ -107,7 +122,7 @@ class NvidiaLLMProvider(LLMProvider):
                 friendly_name, model_id = self._resolve_model(current_model)
                 client = self._get_client(friendly_name)
 
-                self.logger.debug(f"Chat request trying: model={model_id} (param size step-down)")
+                self.logger.debug("Chat request trying: model=%s (param size step-down)", model_id)
 
                 start_time = time.time()
 
@@ -125,7 +140,7 @@ class NvidiaLLMProvider(LLMProvider):
                         kwargs["tools"] = tools
                         kwargs["tool_choice"] = "auto"
                     elif tools and not model_info.get("supports_tools", True):
-                        self.logger.debug(f"Skipping tools for {friendly_name} — unsupported")
+                        self.logger.debug("Skipping tools for %s — unsupported", friendly_name)
 
                     return client.chat.completions.create(**kwargs)
 
@@ -134,11 +149,14 @@ class NvidiaLLMProvider(LLMProvider):
 
                 if stream:
                     return self._handle_stream(response, friendly_name, model_id, duration_ms)
-                else:
-                    return self._handle_response(response, friendly_name, model_id, duration_ms)
+
+                result = self._handle_response(response, friendly_name, model_id, duration_ms)
+                if cache_key:
+                    RESPONSE_CACHE.put(cache_key, result)
+                return result
 
             except Exception as e:
-                self.logger.warning(f"Model {current_model} failed ({e}). Stepping down to next fallback model...")
+                self.logger.warning("Model %s failed (%s). Stepping down to next fallback model...", current_model, e)
                 last_exception = e
                 # Fall through and let loop try the next model in the chain
                 continue
@@ -181,6 +199,7 @@ class NvidiaLLMProvider(LLMProvider):
                 "prompt_tokens": response.usage.prompt_tokens,
                 "completion_tokens": response.usage.completion_tokens,
                 "total_tokens": response.usage.total_tokens,
+                "cached_tokens": self._cached_prompt_tokens(response.usage),
             }
 
         tokens = result["usage"].get("total_tokens", 0)
@@ -191,9 +210,15 @@ class NvidiaLLMProvider(LLMProvider):
 
     def _handle_stream(self, response, friendly_name: str,
                        model_id: str, start_duration_ms: float) -> Generator:
-        """Process a streaming response, yielding chunks."""
-        full_content = ""
-        tool_calls_buffer = {}
+        """
+        Process a streaming response, yielding chunks.
+
+        Content chunks reuse one dict whose "delta" is overwritten per token;
+        consumers must read it before advancing and must not keep a reference.
+        """
+        parts: list[str] = []  # Joined once at finish — += is quadratic on long streams
+        tool_calls_buffer: list[dict | None] = []  # Indexed by tc.index (small ints)
+        content_frame = {"delta": "", "type": "content"}
 
         try:
             for chunk in response:
@@ -204,43 +229,47 @@ class NvidiaLLMProvider(LLMProvider):
 
                 # Text content
                 if delta.content:
-                    full_content += delta.content
-                    yield {"delta": delta.content, "type": "content"}
+                    parts.append(delta.content)
+                    content_frame["delta"] = delta.content
+                    yield content_frame
 
                 # Tool calls (streamed incrementally)
                 if delta.tool_calls:
                     for tc in delta.tool_calls:
                         idx = tc.index
-                        if idx not in tool_calls_buffer:
-                            tool_calls_buffer[idx] = {
+                        if idx >= len(tool_calls_buffer):
+                            tool_calls_buffer.extend([None] * (idx + 1 - len(tool_calls_buffer)))
+                        entry = tool_calls_buffer[idx]
+                        if entry is None:
+                            entry = tool_calls_buffer[idx] = {
                                 "id": tc.id or "",
                                 "function": {"name": "", "arguments": ""},
                             }
                         if tc.id:
-                            tool_calls_buffer[idx]["id"] = tc.id
+                            entry["id"] = tc.id
                         if tc.function:
                             if tc.function.name:
-                                tool_calls_buffer[idx]["function"]["name"] += tc.function.name
+                                entry["function"]["name"] += tc.function.name
                             if tc.function.arguments:
-                                tool_calls_buffer[idx]["function"]["arguments"] += tc.function.arguments
+                                entry["function"]["arguments"] += tc.function.arguments
 
                 # Check for finish
                 if chunk.choices[0].finish_reason:
                     if tool_calls_buffer:
                         yield {
-                            "tool_calls": list(tool_calls_buffer.values()),
+                            "tool_calls": [tc for tc in tool_calls_buffer if tc is not None],
                             "type": "tool_calls",
                         }
                     yield {
                         "finish_reason": chunk.choices[0].finish_reason,
                         "type": "finish",
-                        "full_content": full_content,
+                        "full_content": "".join(parts),
                     }
 
         finally:
             duration_ms = (time.time() * 1000) - (start_duration_ms - (start_duration_ms % 1))
             self._track_call("chat/completions", model_id, duration_ms,
-                             status="ok", tokens_used=len(full_content) // 4)
+                             status="ok", tokens_used=sum(map(len, parts)) // 4)
 
     def list_models(self) -> list[dict]:
         """Return available LLM models with their info."""
@@ -9,14 +9,16 @@ Updated: 2026-02-17 (Switch to HTTP API)
 
 import io
 import time
-from openai import OpenAI
 
+from providers._http import get_shared_httpx, prewarm
 from providers.base import STTProvider
 from config.settings import NVIDIA_BASE_URL, get_api_key
 from utils.logger import get_logger
 
 logger = get_logger("providers.nvidia_stt")
 
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+
 
 class NvidiaSTTProvider(STTProvider):
     """
@@ -34,10 +36,13 @@ class NvidiaSTTProvider(STTProvider):
         """Initialize OpenAI client for Groq STT."""
         api_key = get_api_key("whisper-lv3")
         if api_key:
+            from openai import OpenAI  # Deferred: only needed when STT is configured
             self._client = OpenAI(
-                base_url="https://api.groq.com/openai/v1",
+                base_url=GROQ_BASE_URL,
                 api_key=api_key,
+                http_client=get_shared_httpx(),
             )
+            prewarm(GROQ_BASE_URL)
             self.logger.info("Groq STT client initialized")
         else:
             self.logger.warning("GROQ_API_KEY not found. STT disabled.")
@@ -59,7 +64,7 @@ class NvidiaSTTProvider(STTProvider):
         if not self._client:
             raise RuntimeError("STT not available — missing API key")
 
-        self.logger.info(f"STT: transcribing {len(audio_bytes)} bytes")
+        self.logger.info("STT: transcribing %s bytes", len(audio_bytes))
         start_time = time.time()
 
         def _make_request():
@@ -82,7 +87,7 @@ class NvidiaSTTProvider(STTProvider):
             transcript = response.text
             
             self._track_call("audio/transcriptions", self.model, duration_ms, status="ok")
-            self.logger.info(f"STT result: '{transcript[:80]}...' ({duration_ms:.0f}ms)")
+            self.logger.info("STT result: '%s...' (%.0fms)", transcript[:80], duration_ms)
 
             return transcript
 
@@ -10,13 +10,15 @@ Falls back gracefully if not installed.
 
 import time
 import struct
+import importlib.util
 import wave
 from pathlib import Path
+from typing import Generator
 
 from providers.base import TTSProvider
 from config.settings import NVIDIA_KEYS, DATA_DIR
 from utils.logger import get_logger
-from utils.helpers import get_timestamp_short
+from utils.helpers import get_unique_timestamp
 
 logger = get_logger("providers.nvidia_tts")
 
@@ -32,6 +34,42 @@ VOICES = {
     "default": "English-US.Female-1",
 }
 
+# G.711 µ-law: 8 kHz, 8 bits per sample — plenty for speech
+MULAW_SAMPLE_RATE = 8000
+_WAVE_FORMAT_MULAW = 7
+
+
+def _write_mulaw_wav(f, chunks, sample_rate: int):
+    """
+    Stream mono µ-law samples into a WAV file. The stdlib wave module only
+    writes PCM, so the header (fmt with cbSize, fact, data) is packed by hand
+    and its sizes are patched once the stream ends.
+    """
+    f.write(b"RIFF\0\0\0\0WAVE")
+    # fmt: tag, channels, rate, byte rate, block align, bits/sample, cbSize
+    f.write(b"fmt " + struct.pack("<IHHIIHHH", 18, _WAVE_FORMAT_MULAW, 1,
+                                  sample_rate, sample_rate, 1, 8, 0))
+    fact_pos = f.tell() + 8
+    f.write(b"fact" + struct.pack("<II", 4, 0))
+    data_pos = f.tell() + 4
+    f.write(b"data\0\0\0\0")
+
+    n = 0
+    for chunk in chunks:
+        f.write(chunk)
+        n += len(chunk)
+    if n % 2:
+        f.write(b"\0")  # RIFF chunks are word-aligned
+
+    end = f.tell()
+    f.seek(4)
+    f.write(struct.pack("<I", end - 8))
+    f.seek(fact_pos)
+    f.write(struct.pack("<I", n))  # one byte per sample
+    f.seek(data_pos)
+    f.write(struct.pack("<I", n))
+    f.seek(end)
+
 
 class NvidiaTTSProvider(TTSProvider):
     """
@@ -42,23 +80,35 @@ class NvidiaTTSProvider(TTSProvider):
     def __init__(self, rate_limit_rpm: int = 35):
         super().__init__(name="nvidia_tts", rate_limit_rpm=rate_limit_rpm)
         self._riva_available = False
+        self._riva_module = None
         self._tts_service = None
         self._init_riva()
 
     def _init_riva(self):
-        """Initialize Riva client. Graceful fallback if not installed."""
-        try:
-            import riva.client
-            self._riva = riva.client
-            self._riva_available = True
-            self.logger.info("NVIDIA Riva TTS client loaded")
-        except ImportError:
-            self._riva_available = False
+        """
+        Check that the Riva client is installed. Graceful fallback if not.
+        The import itself (grpc + protobuf) is deferred until first synthesis.
+        """
+        self._riva_available = importlib.util.find_spec("riva") is not None
+        if not self._riva_available:
             self.logger.warning(
                 "nvidia-riva-client not installed. TTS disabled. "
                 "Install with: pip install nvidia-riva-client"
             )
 
+    @property
+    def _riva(self):
+        """riva.client, imported on first use."""
+        if self._riva_module is None:
+            try:
+                import riva.client
+            except ImportError:
+                self._riva_available = False
+                raise RuntimeError("nvidia-riva-client not installed")
+            self._riva_module = riva.client
+            self.logger.info("NVIDIA Riva TTS client loaded")
+        return self._riva_module
+
     def _get_service(self):
         """Get or create the TTS service connection."""
         if self._tts_service is not None:
@@ -103,7 +153,7 @@ class NvidiaTTSProvider(TTSProvider):
 
         # Resolve voice name
         voice_name = VOICES.get(voice, voice)
-        self.logger.info(f"TTS: '{text[:50]}...' voice={voice_name}")
+        self.logger.info("TTS: '%s...' voice=%s", text[:50], voice_name)
 
         start_time = time.time()
 
@@ -123,7 +173,7 @@ class NvidiaTTSProvider(TTSProvider):
             duration_ms = (time.time() - start_time) * 1000
 
             self._track_call("tts/synthesize", "magpie-tts", duration_ms, status="ok")
-            self.logger.info(f"TTS complete: {len(audio_bytes)} bytes ({duration_ms:.0f}ms)")
+            self.logger.info("TTS complete: %s bytes (%.0fms)", len(audio_bytes), duration_ms)
 
             return audio_bytes
 
@@ -132,32 +182,87 @@ class NvidiaTTSProvider(TTSProvider):
             self._track_call("tts/synthesize", "magpie-tts", duration_ms, status=f"error: {e}")
             raise
 
+    def text_to_speech_stream(self, text: str, voice: str = "default",
+                              language: str = "en-US",
+                              sample_rate: int = 44100,
+                              mulaw: bool = False) -> Generator[bytes, None, None]:
+        """
+        Like text_to_speech(), but yields raw PCM chunks as Riva streams them
+        (synthesize_online) instead of returning one buffer at the end.
+        With mulaw=True, Riva returns 8-bit G.711 µ-law samples instead.
+        """
+        if not self._riva_available:
+            raise RuntimeError("TTS not available — install nvidia-riva-client")
+
+        voice_name = VOICES.get(voice, voice)
+        self.logger.info("TTS stream: '%s...' voice=%s", text[:50], voice_name)
+
+        start_time = time.time()
+        total = 0
+        status = "ok"
+        try:
+            self.rate_limiter.wait_if_needed()
+            responses = self._get_service().synthesize_online(
+                text,
+                voice_name=voice_name,
+                language_code=language,
+                encoding=(self._riva.AudioEncoding.MULAW if mulaw
+                          else self._riva.AudioEncoding.LINEAR_PCM),
+                sample_rate_hz=sample_rate,
+            )
+            for response in responses:
+                total += len(response.audio)
+                yield response.audio
+        except Exception as e:
+            status = f"error: {e}"
+            raise
+        finally:
+            duration_ms = (time.time() - start_time) * 1000
+            self._track_call("tts/synthesize_online", "magpie-tts", duration_ms, status=status)
+            self.logger.info("TTS stream complete: %s bytes (%.0fms)", total, duration_ms)
+
     def synthesize_to_file(self, text: str, filepath: Path = None,
                            voice: str = "default", language: str = "en-US",
-                           sample_rate: int = 44100) -> Path:
+                           sample_rate: int = 44100,
+                           high_quality: bool = False) -> Path:
         """
         Synthesize text and save as a WAV file.
+        Audio is written chunk by chunk as it streams in, never held in full.
+
+        By default speech is stored as 8 kHz 8-bit µ-law (G.711, telephone
+        quality) — about 1/11 the size of 44.1 kHz 16-bit PCM. Pass
+        high_quality=True for full-rate PCM at sample_rate.
 
         Returns:
             Path to the saved WAV file
         """
-        audio_bytes = self.text_to_speech(text, voice, language, sample_rate)
-
         if filepath is None:
-            timestamp = get_timestamp_short()
+            timestamp = get_unique_timestamp()
             filepath = DATA_DIR / "audio" / f"tts_{timestamp}.wav"
 
         filepath = Path(filepath)
         filepath.parent.mkdir(parents=True, exist_ok=True)
 
-        # Write as WAV
-        with wave.open(str(filepath), "wb") as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(2)  # 16-bit
-            wf.setframerate(sample_rate)
-            wf.writeframes(audio_bytes)
+        # Write as WAV — close() patches the header with the final frame count
+        try:
+            if high_quality:
+                with wave.open(str(filepath), "wb") as wf:
+                    wf.setnchannels(1)
+                    wf.setsampwidth(2)  # 16-bit
+                    wf.setframerate(sample_rate)
+                    for chunk in self.text_to_speech_stream(text, voice, language, sample_rate):
+                        wf.writeframesraw(chunk)
+            else:
+                chunks = self.text_to_speech_stream(
+                    text, voice, language, MULAW_SAMPLE_RATE, mulaw=True,
+                )
+                with open(filepath, "wb") as f:
+                    _write_mulaw_wav(f, chunks, MULAW_SAMPLE_RATE)
+        except Exception:
+            filepath.unlink(missing_ok=True)  # Don't leave a truncated WAV behind
+            raise
 
-        self.logger.info(f"TTS saved to: {filepath}")
+        self.logger.info("TTS saved to: %s", filepath)
         return filepath
 
     @property
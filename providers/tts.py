@@ -44,9 +44,9 @@ async def text_to_speech(text: str, output_file: str, voice: str = DEFAULT_VOICE
         communicate = edge_tts.Communicate(text, voice)
         await communicate.save(output_file)
         
-        logger.info(f"TTS generated: {output_file} ({len(text)} chars)")
+        logger.info("TTS generated: %s (%s chars)", output_file, len(text))
         return output_file
         
     except Exception as e:
-        logger.error(f"TTS generation failed: {e}")
+        logger.error("TTS generation failed: %s", e)
         return None
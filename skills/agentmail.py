@@ -4,13 +4,40 @@ Provides email capabilities via agentmail.to API.
 """
 
 import os
-import requests
+import time
+import atexit
+import threading
+import importlib.util
 import json
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from typing import ClassVar, List, Optional
+
+import httpx  # Installed with the openai SDK
 
 from skills.base import Skill
 from tools.base import Tool
 
+AGENTMAIL_BASE_URL = "https://api.agentmail.to/v0"
+
+# HTTP/2 multiplexes concurrent calls over one TLS connection when h2 is
+# installed (pip install httpx[http2]); otherwise httpx speaks HTTP/1.1
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_GET_RETRIES = 3
+_GET_BACKOFF = 0.3
+
+# Fan-out for per-message GETs; they share the client's connection pool
+_FETCH_WORKERS = 8
+_FETCH_POOL = ThreadPoolExecutor(max_workers=_FETCH_WORKERS, thread_name_prefix="agentmail-fetch")
+
+# Repeated inbox peeks within this window are served from memory (0 disables)
+INBOX_CACHE_TTL = float(os.getenv("AGENTMAIL_CACHE_TTL", "5"))
+
+# Per-message body cap so one long thread can't flood the context window
+MAX_BODY_CHARS = 2000
+
 
 class AgentMailSkill(Skill):
     name = "agentmail"
@@ -19,64 +46,122 @@ class AgentMailSkill(Skill):
     def get_tools(self) -> List[Tool]:
         return [
             CheckInboxTool(),
+            FetchMessagesTool(),
             SendEmailTool(),
         ]
 
 
 class AgentMailTool(Tool):
     """Base tool for AgentMail operations."""
-    
+
+    # One multiplexed client shared by every AgentMail tool, built on first use
+    _client: ClassVar[Optional[httpx.Client]] = None
+    _client_key: ClassVar[str] = ""
+    _client_lock: ClassVar[threading.Lock] = threading.Lock()
+
     def _get_api_key(self) -> str:
         key = os.getenv("AGENTMAIL_API_KEY")
         if not key:
             raise ValueError("Missing AGENTMAIL_API_KEY in .env")
         return key
 
+    @classmethod
+    def _get_client(cls, api_key: str) -> httpx.Client:
+        """Return the shared client, rebuilding it only if the API key changed."""
+        if cls._client is not None and cls._client_key == api_key:
+            return cls._client
+        with cls._client_lock:
+            if cls._client is None or cls._client_key != api_key:
+                client = httpx.Client(
+                    base_url=AGENTMAIL_BASE_URL,
+                    headers={
+                        "Authorization": f"Bearer {api_key}",
+                        "Content-Type": "application/json",
+                        "Accept": "application/json",
+                    },
+                    timeout=10.0,
+                    # Retries connection failures only; status retries are in _request
+                    transport=httpx.HTTPTransport(
+                        http2=_HTTP2,
+                        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                        retries=3,
+                    ),
+                )
+                if cls._client is not None:
+                    cls._client.close()
+                else:
+                    atexit.register(cls._close_client)
+                cls._client = client
+                cls._client_key = api_key
+        return cls._client
+
+    @classmethod
+    def _close_client(cls):
+        if cls._client is not None:
+            cls._client.close()
+
     def _request(self, method: str, endpoint: str, data: dict = None) -> dict:
-        api_key = self._get_api_key()
-        url = f"https://api.agentmail.to/v0{endpoint}"
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        }
-        
+        client = self._get_client(self._get_api_key())
+
         try:
             if method == "GET":
-                resp = requests.get(url, headers=headers, params=data, timeout=10)
+                # Reads are idempotent: back off and retry on throttling / 5xx
+                for attempt in range(_GET_RETRIES + 1):
+                    resp = client.get(endpoint, params=data)
+                    if resp.status_code not in _RETRY_STATUSES or attempt == _GET_RETRIES:
+                        break
+                    time.sleep(_GET_BACKOFF * (2 ** attempt))
             else:
-                resp = requests.post(url, headers=headers, json=data, timeout=10)
-            
+                # Never replayed, so a send can't be duplicated
+                resp = client.post(endpoint, json=data)
+
             resp.raise_for_status()
             return resp.json()
-        except requests.HTTPError as e:
-            return {"error": f"HTTP Error: {e.response.text if e.response else str(e)}"}
+        except httpx.HTTPStatusError as e:
+            return {"error": f"HTTP Error: {e.response.text}"}
         except Exception as e:
             return {"error": str(e)}
 
+    # Inbox IDs per API key, shared by every tool instance for the process lifetime
+    _inbox_ids: ClassVar[dict[str, str]] = {}
+    _inbox_lock: ClassVar[threading.Lock] = threading.Lock()
+
     def _get_inbox_id(self) -> str:
         """Fetch the default inbox ID (email address)."""
+        api_key = self._get_api_key()
+
         # 1. Check if we already have it cached
-        if hasattr(self, "_cached_inbox_id"):
-            return self._cached_inbox_id
+        cached = AgentMailTool._inbox_ids.get(api_key)
+        if cached:
+            return cached
 
-        # 2. Fetch from API
-        result = self._request("GET", "/inboxes")
-        if "error" in result:
-            raise ValueError(f"Could not fetch inbox ID: {result['error']}")
-            
-        inboxes = result.get("inboxes", [])
-        if not inboxes:
-            raise ValueError("No inboxes found for this API key.")
-            
-        # 3. Use the first inbox's email address as the ID
-        self._cached_inbox_id = inboxes[0]["inbox_id"]
-        return self._cached_inbox_id
+        with AgentMailTool._inbox_lock:
+            # Another thread may have fetched it while we waited
+            cached = AgentMailTool._inbox_ids.get(api_key)
+            if cached:
+                return cached
+
+            # 2. Fetch from API
+            result = self._request("GET", "/inboxes")
+            if "error" in result:
+                raise ValueError(f"Could not fetch inbox ID: {result['error']}")
+
+            inboxes = result.get("inboxes", [])
+            if not inboxes:
+                raise ValueError("No inboxes found for this API key.")
+
+            # 3. Use the first inbox's email address as the ID
+            inbox_id = inboxes[0]["inbox_id"]
+            AgentMailTool._inbox_ids[api_key] = inbox_id
+            return inbox_id
 
 
 class CheckInboxTool(AgentMailTool):
     name = "check_email"
-    description = "Check recent emails in the inbox. Returns sender, subject, and snippet."
+    description = (
+        "Check recent emails in the inbox. Returns sender, subject, snippet and message ID. "
+        "Use read_emails with the IDs to get full bodies."
+    )
     parameters = {
         "type": "object",
         "properties": {
@@ -88,17 +173,36 @@ class CheckInboxTool(AgentMailTool):
         "required": [],
     }
 
+    # (inbox_id, limit) → (monotonic fetch time, list response)
+    _list_cache: ClassVar[dict[tuple, tuple[float, dict]]] = {}
+    _list_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def invalidate_cache(cls):
+        with cls._list_lock:
+            cls._list_cache.clear()
+
     def execute(self, limit: int = 5) -> str:
         try:
             inbox_id = self._get_inbox_id()
         except Exception as e:
             return f"❌ Error: {str(e)}"
 
-        # Endpoint: GET /v0/inboxes/{inbox_id}/messages
-        result = self._request("GET", f"/inboxes/{inbox_id}/messages", {"limit": limit})
-        
-        if "error" in result:
-            return f"❌ Error checking inbox: {result['error']}"
+        key = (inbox_id, limit)
+        with CheckInboxTool._list_lock:
+            hit = CheckInboxTool._list_cache.get(key)
+        if hit and time.monotonic() - hit[0] < INBOX_CACHE_TTL:
+            result = hit[1]
+        else:
+            # Endpoint: GET /v0/inboxes/{inbox_id}/messages
+            result = self._request("GET", f"/inboxes/{inbox_id}/messages", {"limit": limit})
+
+            if "error" in result:
+                return f"❌ Error checking inbox: {result['error']}"
+
+            if INBOX_CACHE_TTL > 0:
+                with CheckInboxTool._list_lock:
+                    CheckInboxTool._list_cache[key] = (time.monotonic(), result)
             
         msgs = result.get("messages", [])
         if not msgs:
@@ -110,11 +214,67 @@ class CheckInboxTool(AgentMailTool):
             subject = msg.get("subject", "No Subject")
             snippet = msg.get("snippet", "")
             msg_id = msg.get("message_id", "")
-            output.append(f"- **From:** {sender} | **Subj:** {subject}\n  _{snippet}_")
+            output.append(
+                f"- **From:** {sender} | **Subj:** {subject} | **ID:** `{msg_id}`\n  _{snippet}_"
+            )
             
         return "\n".join(output)
 
 
+class FetchMessagesTool(AgentMailTool):
+    name = "read_emails"
+    description = "Read the full bodies of one or more emails by message ID, in a single call."
+    parameters = {
+        "type": "object",
+        "properties": {
+            "message_ids": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Message IDs from check_email",
+            },
+        },
+        "required": ["message_ids"],
+    }
+
+    def execute(self, message_ids: list[str]) -> str:
+        # LLMs sometimes pass a single ID as a bare string
+        if isinstance(message_ids, str):
+            message_ids = [message_ids]
+        if not message_ids:
+            return "❌ Error: no message IDs given."
+
+        try:
+            inbox_id = self._get_inbox_id()
+        except Exception as e:
+            return f"❌ Error: {str(e)}"
+
+        # AgentMail has no multi-ID lookup: fetch concurrently over the shared
+        # client, so N messages cost roughly one round-trip of wall time
+        # Endpoint: GET /v0/inboxes/{inbox_id}/messages/{message_id}
+        results = _FETCH_POOL.map(
+            # IDs are RFC 822 style (<...@...>); escape them so "/", "?" or "#"
+            # can't change the request target
+            lambda msg_id: self._request(
+                "GET", f"/inboxes/{inbox_id}/messages/{quote(msg_id, safe='')}"
+            ),
+            message_ids,
+        )
+
+        output = []
+        for msg_id, msg in zip(message_ids, results):
+            if "error" in msg:
+                output.append(f"### `{msg_id}`\n❌ Error: {msg['error']}")
+                continue
+            sender = msg.get("from_address", "Unknown")
+            subject = msg.get("subject", "No Subject")
+            body = msg.get("text") or msg.get("extracted_text") or msg.get("snippet", "")
+            if len(body) > MAX_BODY_CHARS:
+                body = body[:MAX_BODY_CHARS] + "\n... (truncated)"
+            output.append(f"### {subject}\n**From:** {sender} | **ID:** `{msg_id}`\n\n{body}")
+
+        return "\n\n".join(output)
+
+
 class SendEmailTool(AgentMailTool):
     name = "send_email"
     description = "Send an email to a recipient."
@@ -154,5 +314,8 @@ class SendEmailTool(AgentMailTool):
         
         if "error" in result:
             return f"❌ Failed to send email: {result['error']}"
+
+        # Sent mail can show up in the message list; don't serve a stale view
+        CheckInboxTool.invalidate_cache()
             
         return f"✅ Email sent to {to}!"
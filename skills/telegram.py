@@ -4,12 +4,24 @@ Provides Telegram messaging capabilities.
 """
 
 import os
+import atexit
 import requests
 from typing import List
 
+from requests.adapters import HTTPAdapter
+
 from skills.base import Skill
 from tools.base import Tool
 
+TELEGRAM_API_BASE = "https://api.telegram.org/bot"
+
+# Keep-alive pool reused by every Telegram tool call instead of a fresh
+# TCP+TLS handshake per message. No automatic retries: sendMessage isn't
+# idempotent and a replay would post the message twice.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=8, max_retries=0))
+atexit.register(_SESSION.close)
+
 
 class TelegramSkill(Skill):
     name = "telegram"
@@ -37,13 +49,13 @@ class TelegramTool(Tool):
 
     def _request(self, method: str, endpoint: str, data: dict = None) -> dict:
         api_key = self._get_api_key()
-        url = f"https://api.telegram.org/bot{api_key}{endpoint}"
-        
+        url = TELEGRAM_API_BASE + api_key + endpoint
+
         try:
             if method == "GET":
-                resp = requests.get(url, params=data, timeout=10)
+                resp = _SESSION.get(url, params=data, timeout=10)
             else:
-                resp = requests.post(url, json=data, timeout=10)
+                resp = _SESSION.post(url, json=data, timeout=10)
             
             resp.raise_for_status()
             return resp.json()
@@ -18,8 +18,10 @@ Usage:
 """
 
 import time
+import logging
 from abc import ABC, abstractmethod
 
+from utils import fast_json
 from utils.logger import get_logger, log_tool_execution
 
 logger = get_logger("tools.base")
@@ -56,23 +58,26 @@ class Tool(ABC):
 
     def safe_execute(self, **kwargs) -> str:
         """Execute with logging, timing, and error handling."""
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         try:
             result = self.execute(**kwargs)
-            duration_ms = (time.time() - start_time) * 1000
-            log_tool_execution(
-                self.logger, self.name, kwargs,
-                result_preview=str(result)[:200],
-                duration_ms=duration_ms, success=True,
-            )
+            # Skip building the log line entirely when INFO is filtered out
+            if self.logger.isEnabledFor(logging.INFO):
+                log_tool_execution(
+                    self.logger, self.name, kwargs,
+                    result_preview=str(result)[:200],
+                    duration_ms=(time.perf_counter_ns() - start_ns) / 1_000_000,
+                    success=True,
+                )
             return result
         except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            log_tool_execution(
-                self.logger, self.name, kwargs,
-                result_preview=str(e),
-                duration_ms=duration_ms, success=False,
-            )
+            if self.logger.isEnabledFor(logging.INFO):
+                log_tool_execution(
+                    self.logger, self.name, kwargs,
+                    result_preview=str(e),
+                    duration_ms=(time.perf_counter_ns() - start_ns) / 1_000_000,
+                    success=False,
+                )
             return f"Error executing {self.name}: {e}"
 
     def to_openai_tool(self) -> dict:
@@ -92,11 +97,23 @@ class ToolRegistry:
 
     def __init__(self):
         self._tools: dict[str, Tool] = {}
+        self._version = 0  # Bumped on every mutation so callers can memoize schemas
+        self._openai_tools: list[dict] | None = None
+        self._openai_tools_version = -1
+        self._openai_tools_json: bytes | None = None
+        self._openai_tools_json_version = -1
+        self._tool_list: list[dict] | None = None
+        self._tool_list_version = -1
         self.logger = get_logger("tools.registry")
 
+    @property
+    def version(self) -> int:
+        return self._version
+
     def register(self, tool: Tool):
         """Register a tool by name."""
         self._tools[tool.name] = tool
+        self._version += 1
         self.logger.debug(f"Registered tool: {tool.name}")
 
     def get(self, name: str) -> Tool | None:
@@ -111,15 +128,38 @@ class ToolRegistry:
         return tool.safe_execute(**kwargs)
 
     def get_openai_tools(self) -> list[dict]:
-        """Export all tools as OpenAI function-calling definitions."""
-        return [tool.to_openai_tool() for tool in self._tools.values()]
+        """
+        Export all tools as OpenAI function-calling definitions.
+        Cached until the registry changes — treat the returned list as read-only.
+        """
+        if self._openai_tools_version != self._version:
+            self._openai_tools = [tool.to_openai_tool() for tool in self._tools.values()]
+            self._openai_tools_version = self._version
+        return self._openai_tools
+
+    def get_openai_tools_json_bytes(self) -> bytes:
+        """
+        The tool definitions pre-serialized as JSON bytes, for transports
+        that can splice a body fragment (and for hashing the prompt prefix).
+        Cached until the registry changes.
+        """
+        if self._openai_tools_json_version != self._version:
+            self._openai_tools_json = fast_json.dumps_bytes(self.get_openai_tools())
+            self._openai_tools_json_version = self._version
+        return self._openai_tools_json
 
     def list_tools(self) -> list[dict]:
-        """Return a list of all registered tools with their info."""
-        return [
-            {"name": t.name, "description": t.description}
-            for t in self._tools.values()
-        ]
+        """
+        Return a list of all registered tools with their info.
+        Cached until the registry changes — treat the returned list as read-only.
+        """
+        if self._tool_list_version != self._version:
+            self._tool_list = [
+                {"name": t.name, "description": t.description}
+                for t in self._tools.values()
+            ]
+            self._tool_list_version = self._version
+        return self._tool_list
 
     @property
     def count(self) -> int:
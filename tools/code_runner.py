@@ -6,6 +6,9 @@ Created: 2026-02-15
 """
 
 import os
+import math
+import time
+import selectors
 import tempfile
 import subprocess
 from pathlib import Path
@@ -14,7 +17,6 @@ from tools.base import Tool
 
 MAX_OUTPUT = 8000
 
-
 class CodeRunnerTool(Tool):
     """Execute code snippets in a sandboxed subprocess."""
 
@@ -44,67 +46,176 @@ class CodeRunnerTool(Tool):
         "required": ["code"],
     }
 
-    # Map language → (file extension, interpreter command)
+    # Map language → interpreter command that reads the program from stdin
     RUNNERS = {
-        "python": (".py", ["python3"]),
-        "javascript": (".js", ["node"]),
-        "bash": (".sh", ["bash"]),
+        "python": ["python3", "-"],
+        "javascript": ["node", "-"],
+        "bash": ["bash", "-s"],
     }
 
+    @staticmethod
+    def _run_env() -> dict:
+        return {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+
+    @classmethod
+    def _spawn_worker(cls):
+        """(Re)start the shared worker; caller holds _worker_lock."""
+        if cls._worker is not None and cls._worker.alive:
+            return
+        try:
+            cls._worker = _PythonWorker(tempfile.gettempdir(), cls._run_env())
+        except OSError:
+            cls._worker = None
+            cls._worker_supported = False  # No python3 on PATH — don't retry
+            return
+        if not getattr(cls, "_atexit_registered", False):
+            atexit.register(lambda: cls._worker and cls._worker.kill())
+            cls._atexit_registered = True
+
+    @staticmethod
+    def _format(stdout: str, stderr: str, returncode: int,
+                capped: bool = False) -> str:
+        output = ""
+        if stdout:
+            output += stdout
+        if stderr:
+            if output:
+                output += "\n--- stderr ---\n"
+            output += stderr
+
+        if capped:
+            # We killed it for flooding output; its exit code is our SIGKILL
+            return output[:MAX_OUTPUT] + f"\n... (truncated — stopped after {MAX_OUTPUT} bytes of output)"
+
+        if len(output) > MAX_OUTPUT:
+            output = output[:MAX_OUTPUT] + f"\n... (truncated)"
+
+        if returncode != 0:
+            output = f"Exit code: {returncode}\n{output}"
+
+        return output.strip() or "(no output)"
+
+    def _run_capped(self, interpreter: list[str], code: str,
+                    timeout: float) -> tuple[str, str, int, bool]:
+        """
+        Run interpreter with code on stdin, reading stdout/stderr as they
+        arrive and killing the process once MAX_OUTPUT bytes have been
+        captured, so a runaway print loop can't grow memory until the timeout.
+
+        Returns (stdout, stderr, returncode, capped). Raises
+        subprocess.TimeoutExpired when the wall-clock limit is hit.
+        """
+        proc = subprocess.Popen(
+            interpreter,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=tempfile.gettempdir(),
+            env=self._run_env(),
+        )
+        out_fd, err_fd, in_fd = proc.stdout.fileno(), proc.stderr.fileno(), proc.stdin.fileno()
+        captured = {out_fd: bytearray(), err_fd: bytearray()}
+        pending = memoryview(code.encode("utf-8"))
+        deadline = time.monotonic() + timeout
+        total = 0
+        capped = timed_out = False
+
+        try:
+            with selectors.DefaultSelector() as sel:
+                sel.register(out_fd, selectors.EVENT_READ)
+                sel.register(err_fd, selectors.EVENT_READ)
+                # Feed stdin from the same loop: bash -s runs (and prints)
+                # while still reading, so a blocking write could deadlock
+                os.set_blocking(in_fd, False)
+                sel.register(in_fd, selectors.EVENT_WRITE)
+
+                while sel.get_map() and not capped:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        timed_out = True
+                        break
+                    for key, _ in sel.select(remaining):
+                        if key.fd == in_fd:
+                            try:
+                                pending = pending[os.write(in_fd, pending[:65536]):]
+                            except BrokenPipeError:
+                                pending = pending[:0]
+                            if not pending:
+                                sel.unregister(in_fd)
+                                proc.stdin.close()
+                            continue
+                        chunk = os.read(key.fd, 4096)
+                        if not chunk:
+                            sel.unregister(key.fd)
+                            continue
+                        captured[key.fd] += chunk
+                        total += len(chunk)
+                        if total >= MAX_OUTPUT:
+                            capped = True
+                            break
+            if not (capped or timed_out):
+                # Output closed; the process may still be finishing up
+                try:
+                    proc.wait(timeout=max(deadline - time.monotonic(), 0))
+                except subprocess.TimeoutExpired:
+                    timed_out = True
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+            for pipe in (proc.stdin, proc.stdout, proc.stderr):
+                try:
+                    pipe.close()
+                except OSError:
+                    pass
+
+        if timed_out:
+            raise subprocess.TimeoutExpired(interpreter, timeout)
+
+        # One decode at the end instead of an incremental text-mode decoder
+        return (
+            captured[out_fd].decode("utf-8", errors="replace"),
+            captured[err_fd].decode("utf-8", errors="replace"),
+            proc.returncode,
+            capped,
+        )
+
     def execute(self, code: str, language: str = "python",
                 timeout: int = 15) -> str:
         if language not in self.RUNNERS:
             return f"❌ Unsupported language: {language}. Use: {list(self.RUNNERS.keys())}"
 
-        ext, interpreter = self.RUNNERS[language]
-
-        # Write code to temp file
+        # LLMs sometimes pass timeout as a string
         try:
-            with tempfile.NamedTemporaryFile(
-                mode="w", suffix=ext, delete=False, dir=tempfile.gettempdir()
-            ) as f:
-                f.write(code)
-                temp_path = f.name
-        except Exception as e:
-            return f"❌ Error creating temp file: {e}"
+            timeout = float(timeout)
+        except (TypeError, ValueError):
+            return f"❌ Invalid timeout: {timeout!r}. Use a number of seconds."
+        if not (timeout > 0 and math.isfinite(timeout)):
+            return f"❌ Invalid timeout: {timeout:g}. Use a positive number of seconds."
+
+        interpreter = self.RUNNERS[language]
 
-        self.logger.info(f"Running {language} code ({len(code)} chars, timeout={timeout}s)")
+        self.logger.info(f"Running {language} code ({len(code)} chars, timeout={timeout:g}s)")
 
         try:
+            if os.name == "posix":
+                return self._format(*self._run_capped(interpreter, code, timeout))
+
+            # Code is piped over stdin — no temp file to write and unlink per run
             result = subprocess.run(
-                interpreter + [temp_path],
+                interpreter,
+                input=code,
                 capture_output=True,
                 text=True,
                 timeout=timeout,
                 cwd=tempfile.gettempdir(),
-                env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+                env=self._run_env(),
             )
-
-            output = ""
-            if result.stdout:
-                output += result.stdout
-            if result.stderr:
-                if output:
-                    output += "\n--- stderr ---\n"
-                output += result.stderr
-
-            if len(output) > MAX_OUTPUT:
-                output = output[:MAX_OUTPUT] + f"\n... (truncated)"
-
-            if result.returncode != 0:
-                output = f"Exit code: {result.returncode}\n{output}"
-
-            return output.strip() or "(no output)"
+            return self._format(result.stdout, result.stderr, result.returncode)
 
         except subprocess.TimeoutExpired:
-            return f"⏰ Code timed out after {timeout}s"
+            return f"⏰ Code timed out after {timeout:g}s"
         except FileNotFoundError:
             return f"❌ Interpreter not found: {interpreter[0]}"
         except Exception as e:
             return f"❌ Error running code: {e}"
-        finally:
-            # Clean up temp file
-            try:
-                os.unlink(temp_path)
-            except OSError:
-                pass
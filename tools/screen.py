@@ -101,32 +101,142 @@ class ScreenCaptureTool(Tool):
             resize_factor: 0.1 to 1.0 (default 1.0)
             grayscale: Convert to black & white (default False)
         """
+        raw = self.capture_raw()
+        if raw is None:
+            return None
+        return self.encode_jpeg(raw, quality=quality, resize_factor=resize_factor,
+                                grayscale=grayscale)
+
+    def capture_raw(self):
+        """
+        Capture the screen once as an HxWx3 uint8 numpy array.
+
+        Callers that need several renditions of the same frame (diff thumbnail,
+        VLM upload) should capture once here and encode from the array.
+        """
         try:
             import pyautogui
+            import numpy as np
+
+            return np.asarray(pyautogui.screenshot().convert("RGB"))
+
+        except Exception as e:
+            self.logger.error(f"Screen capture failed: {e}")
+            return None
+
+    def encode_jpeg(self, raw, quality: int = 60, resize_factor: float = 1.0,
+                    grayscale: bool = False) -> str | None:
+        """
+        Encode a frame from capture_raw() as base64 JPEG.
+
+        Args:
+            raw: HxWx3 (or HxW grayscale) uint8 array
+            quality: JPEG quality (1-95)
+            resize_factor: 0.1 to 1.0 (default 1.0)
+            grayscale: Convert to black & white (default False)
+        """
+        try:
             from PIL import Image
-            
-            # Capture
-            screenshot = pyautogui.screenshot()
-            
+
+            img = Image.fromarray(raw)
+
             # Resize
             if resize_factor < 1.0:
                 new_size = (
-                    int(screenshot.width * resize_factor),
-                    int(screenshot.height * resize_factor)
+                    int(img.width * resize_factor),
+                    int(img.height * resize_factor)
                 )
-                screenshot = screenshot.resize(new_size, Image.Resampling.LANCZOS)
-                
+                img = img.resize(new_size, Image.Resampling.LANCZOS)
+
             # Grayscale
             if grayscale:
-                screenshot = screenshot.convert("L")
-                
+                img = img.convert("L")
+
             # Convert to bytes
             buffer = io.BytesIO()
-            screenshot.save(buffer, format="JPEG", quality=quality)
+            img.save(buffer, format="JPEG", quality=quality)
             return base64.b64encode(buffer.getvalue()).decode("utf-8")
-            
+
         except Exception as e:
-            self.logger.error(f"Screen capture failed: {e}")
+            self.logger.error(f"JPEG encode failed: {e}")
+            return None
+
+    def encode_for_vlm(self, raw, max_side: int = 1024, quality: int = 65) -> str | None:
+        """
+        Encode a frame from capture_raw() as base64 JPEG sized for a vision model.
+
+        VLMs downsample large images anyway, so the long side is capped at
+        max_side before encoding — smaller upload and a much cheaper encode.
+        """
+        try:
+            from PIL import Image
+
+            img = Image.fromarray(raw)
+            if max(img.size) > max_side:
+                # reducing_gap does a fast integer pre-reduce before resampling
+                img.thumbnail((max_side, max_side), Image.Resampling.BILINEAR,
+                              reducing_gap=2.0)
+
+            buffer = io.BytesIO()
+            img.save(buffer, format="JPEG", quality=quality)
+            return base64.b64encode(buffer.getbuffer()).decode("ascii")
+
+        except Exception as e:
+            self.logger.error(f"VLM encode failed: {e}")
+            return None
+
+    def thumb_gray(self, raw, size: tuple[int, int] = (160, 90)):
+        """
+        Downsample a frame from capture_raw() to a small grayscale uint8 array.
+        Used for cheap change detection without any JPEG/base64 round-trip.
+        """
+        try:
+            from PIL import Image
+            import numpy as np
+
+            img = Image.fromarray(raw).convert("L").resize(size, Image.Resampling.BOX)
+            return np.asarray(img)
+
+        except Exception as e:
+            self.logger.error(f"Thumbnail failed: {e}")
+            return None
+
+    def thumb_diff(self, thumb1, thumb2) -> float:
+        """
+        Calculate percentage difference between two thumb_gray() arrays.
+        Returns 0.0 to 100.0.
+        """
+        if thumb1 is None or thumb2 is None:
+            return 100.0
+
+        import numpy as np
+
+        if thumb1.shape != thumb2.shape:
+            return 100.0
+
+        # int16 so the subtraction can't wrap around
+        mean_diff = np.abs(thumb1.astype(np.int16) - thumb2.astype(np.int16)).mean()
+        return float(mean_diff) * 100.0 / 255.0
+
+    def dhash(self, frame) -> int | None:
+        """
+        64-bit difference hash of a frame (raw or thumb_gray() output).
+
+        Two frames' Hamming distance, (h1 ^ h2).bit_count(), is 0-64 and is
+        insensitive to small encoding/noise jitter.
+        """
+        try:
+            from PIL import Image
+            import numpy as np
+
+            small = np.asarray(
+                Image.fromarray(frame).convert("L").resize((9, 8), Image.Resampling.BOX)
+            )
+            bits = small[:, 1:] > small[:, :-1]
+            return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+        except Exception as e:
+            self.logger.error(f"dHash failed: {e}")
             return None
 
     def calculate_diff(self, img1_b64: str, img2_b64: str) -> float:
@@ -94,9 +94,8 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
     await context.bot.send_chat_action(chat_id=chat_id, action="typing")
 
     # Get response from agent (not streaming for Telegram to keep it simple)
-    # Blocking call needs to be run in executor to not block asyncio loop
-    loop = asyncio.get_running_loop()
-    response_text = await loop.run_in_executor(None, agent.chat, user_text, False)
+    # chat_async runs the blocking turn off the event loop
+    response_text = await agent.chat_async(user_text, stream=False)
 
     # Send response with image support
     await send_response_with_images(update, context, response_text)
@@ -175,8 +174,8 @@ async def handle_voice_message(update: Update, context: ContextTypes.DEFAULT_TYP
         audio_bytes = video_bio.read()
 
         # 2. Transcribe
-        from providers.nvidia_stt import NvidiaSTTProvider
-        stt = NvidiaSTTProvider()
+        from providers import get_stt
+        stt = get_stt()  # Shared instance — one client and pool per process
         
         if not stt.available:
             await update.message.reply_text("❌ Voice is disabled (missing API key).")
@@ -189,7 +188,7 @@ async def handle_voice_message(update: Update, context: ContextTypes.DEFAULT_TYP
         await context.bot.send_chat_action(chat_id=chat_id, action="typing")
 
         # 3. Send to Agent
-        response_text = await loop.run_in_executor(None, agent.chat, transcript, False)
+        response_text = await agent.chat_async(transcript, stream=False)
 
         # 4. Reply with images support
         await send_response_with_images(update, context, response_text)
@@ -279,7 +278,12 @@ class TelegramBot:
         await application.start()
         await application.updater.start_polling(allowed_updates=Update.ALL_TYPES)
         
-        # Keep running until cancelled
-        # In a real app we'd use a stop signal, here we just wait forever
-        while True:
-            await asyncio.sleep(1)
+        # Keep running until cancelled. Park on an event that is never set
+        # rather than a sleep(1) loop, so this thread doesn't wake every second
+        # to compete with the CLI and web threads for the GIL.
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await application.updater.stop()
+            await application.stop()
+            await application.shutdown()
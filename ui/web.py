@@ -69,11 +69,33 @@ def create_app() -> Flask:
     global _agent, _chat_store
 
     app = Flask(__name__)
+    # Generated images never change once written — let browsers keep them
+    app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 3600
     _agent = AgentCore()
     _agent.on_response(_on_event)
     _agent.approval_callback = web_approval_callback
     _chat_store = ChatStore()
 
+    # The model list is static for the process; only the selection changes
+    llm_models = [
+        {
+            "name": name,
+            "categories": info.get("categories", []),
+            "description": info.get("description", ""),
+        }
+        for name, info in MODEL_REGISTRY.items()
+        if info.get("type") in ("llm", "vlm")
+    ]
+    # chat_id → sidebar preview (a chat's first message never changes)
+    history_previews: dict[str, str] = {}
+
+    def conditional_json(payload):
+        """JSON response with an ETag so unchanged payloads revalidate as 304."""
+        resp = jsonify(payload)
+        resp.headers["Cache-Control"] = "no-cache"
+        resp.add_etag()
+        return resp.make_conditional(request)
+
     @app.route("/")
     def index():
         return render_template_string(HTML_TEMPLATE)
@@ -248,16 +270,18 @@ def create_app() -> Flask:
             # Get first user message as preview if title is default
             preview = c.get("title", "New Chat")
             if preview == "New Chat":
-                msgs = _chat_store.get_messages(c["id"], limit=1)
-                if msgs:
-                    preview = msgs[0]["content"][:50] + "..."
+                if c["id"] not in history_previews:
+                    msgs = _chat_store.get_messages(c["id"], limit=1)
+                    if msgs:
+                        history_previews[c["id"]] = msgs[0]["content"][:50] + "..."
+                preview = history_previews.get(c["id"], preview)
             result.append({
                 "chat_id": c["id"],
                 "title": preview,
                 "updated_at": c.get("updated_at", ""),
-                "message_count": c.get("token_count", 0),
+                "message_count": c.get("message_count", 0),
             })
-        return jsonify(result)
+        return conditional_json(result)
 
     @app.route("/api/history/<chat_id>")
     @require_auth
@@ -272,19 +296,11 @@ def create_app() -> Flask:
     @require_auth
     def models():
         """List available LLM models grouped by category."""
-        llm_models = []
-        for name, info in MODEL_REGISTRY.items():
-            if info.get("type") in ("llm", "vlm"):
-                llm_models.append({
-                    "name": name,
-                    "categories": info.get("categories", []),
-                    "description": info.get("description", ""),
-                })
         current_mode = _agent.model_selector.mode
         current_model = _agent.model_override or ModelSelector.get_default_for_mode(
             current_mode if current_mode != "auto" else "thinking"
         )
-        return jsonify({
+        return conditional_json({
             "models": llm_models,
             "current_model": current_model,
             "current_mode": current_mode,
@@ -342,8 +358,8 @@ def create_app() -> Flask:
             audio_bytes = file.read()
             
             # Transcribe
-            from providers.nvidia_stt import NvidiaSTTProvider
-            stt = NvidiaSTTProvider()
+            from providers import get_stt
+            stt = get_stt()  # Shared instance — one client and pool per process
             if not stt.available:
                 return jsonify({"error": "STT not available (check GROQ_API_KEY)"}), 503
             
@@ -0,0 +1,46 @@
+"""
+MRAgent — Fast JSON
+Thin wrapper that uses orjson when installed and falls back to stdlib json.
+
+Created: 2026-10-15
+
+Usage:
+    from utils import fast_json
+    args = fast_json.loads(raw_args)
+    text = fast_json.dumps(tool_calls)
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so this catches both
+JSONDecodeError = json.JSONDecodeError
+
+_ORJSON_OPTS = orjson.OPT_NON_STR_KEYS if HAS_ORJSON else 0
+
+
+def loads(data: str | bytes):
+    """Parse a JSON document from str or bytes."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_bytes(obj) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=_ORJSON_OPTS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(obj) -> str:
+    """Serialize to a compact JSON string."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=_ORJSON_OPTS).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
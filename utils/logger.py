@@ -14,7 +14,7 @@ import sys
 import logging
 from pathlib import Path
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import MemoryHandler, RotatingFileHandler
 
 # Import paths from config — but handle circular import gracefully
 try:
@@ -63,19 +63,31 @@ _loggers = {}
 _file_handler = None
 
 
-def _get_file_handler() -> RotatingFileHandler:
-    """Create or return the shared file handler (rotating, max 5MB per file, keep 3)."""
+def _get_file_handler() -> logging.Handler:
+    """
+    Create or return the shared file handler (rotating, max 5MB per file, keep 3).
+
+    Records are buffered in memory and written in batches of 50, so routine
+    INFO/DEBUG lines don't each cost a synchronous disk write. ERROR and above
+    flush the buffer immediately; logging.shutdown() flushes the rest at exit.
+    """
     global _file_handler
     if _file_handler is None:
         log_file = LOGS_DIR / "mragent.log"
-        _file_handler = RotatingFileHandler(
+        rotating = RotatingFileHandler(
             log_file,
             maxBytes=5 * 1024 * 1024,  # 5MB
             backupCount=3,
             encoding="utf-8",
         )
-        _file_handler.setFormatter(MRAgentFormatter(use_colors=False))
-        _file_handler.setLevel(logging.DEBUG)  # File captures everything
+        rotating.setFormatter(MRAgentFormatter(use_colors=False))
+        rotating.setLevel(logging.DEBUG)  # File captures everything
+        _file_handler = MemoryHandler(
+            capacity=50,
+            flushLevel=logging.ERROR,
+            target=rotating,
+        )
+        _file_handler.setLevel(logging.DEBUG)
     return _file_handler
 
 
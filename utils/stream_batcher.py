@@ -0,0 +1,63 @@
+"""
+MRAgent — Stream Batcher
+Coalesces streamed text deltas before handing them to UI callbacks.
+
+Created: 2026-10-15
+
+Usage:
+    batcher = StreamBatcher(lambda text: emit("delta", text))
+    for delta in stream:
+        batcher.add(delta)
+    batcher.flush()
+"""
+
+import time
+from typing import Callable
+
+DEFAULT_MAX_BYTES = 256
+DEFAULT_MAX_INTERVAL_MS = 40
+DEFAULT_BATCH_SIZE_GROWTH_FACTOR = 3
+
+
+class StreamBatcher:
+    """
+    Buffers text deltas and flushes them as one chunk when either the size
+    or the time window is exceeded.
+
+    The size threshold starts at 1 so the first token is emitted immediately
+    (no added time-to-first-token), then grows geometrically up to max_bytes.
+    """
+
+    def __init__(self, on_flush: Callable[[str], None],
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_interval_ms: int = DEFAULT_MAX_INTERVAL_MS,
+                 growth_factor: int = DEFAULT_BATCH_SIZE_GROWTH_FACTOR):
+        self._on_flush = on_flush
+        self._max_bytes = max_bytes
+        self._max_interval = max_interval_ms / 1000
+        self._growth_factor = growth_factor
+        self._threshold = 1
+        self._parts: list[str] = []
+        self._size = 0
+        self._last_flush = time.monotonic()
+
+    def add(self, text: str):
+        """Buffer a delta, flushing if the size or time window is exceeded."""
+        if not text:
+            return
+        self._parts.append(text)
+        self._size += len(text)
+        if (self._size >= self._threshold
+                or time.monotonic() - self._last_flush >= self._max_interval):
+            self.flush()
+
+    def flush(self):
+        """Emit everything buffered so far as a single chunk."""
+        if not self._parts:
+            return
+        text = "".join(self._parts)
+        self._parts.clear()
+        self._size = 0
+        self._last_flush = time.monotonic()
+        self._threshold = min(self._threshold * self._growth_factor, self._max_bytes)
+        self._on_flush(text)